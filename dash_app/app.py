@@ -1,15 +1,33 @@
 import dash
 from dash import dcc, html, dash_table
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
 import pandas as pd
 import subprocess
 import datetime
 import sqlite3
+import time
+import itertools
+import math
+import queue
+import threading
+import uuid
+from collections import namedtuple
+import numpy as np
+from flask import Response
 from flask_caching import Cache
 import redis
 import os
+import sys
 import logging
 
+# The checker's modules (scripts/) are shared with the dashboard
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from latency_sketch import merge_sketches
+import status_db
+from live_push import CycleFeed
+from frame_codec import pack_frame, unpack_frame
+from downsample import downsample_trace
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,58 +45,345 @@ cache = Cache(app.server, config={
     'CACHE_DEFAULT_TIMEOUT': 60,  # Cache timeout in seconds (5 minutes)
 })
 
-# Function to read and parse data from the SQLite database
-def parse_log(db_path):
-    """
-    Fetches all records from the internet_status table.
-    """
-    try:
-        conn = sqlite3.connect(db_path)
-        query = """
+# Latency metrics stored per cycle, selectable in the latency graph
+LATENCY_COLUMNS = [
+    'avg_latency_ms', 'max_latency_ms', 'min_latency_ms',
+    'p50_latency_ms', 'p95_latency_ms', 'p99_latency_ms',
+    'stddev_latency_ms', 'jitter_ms',
+]
+
+# Columns read from internet_status for the dashboard; {source} is the
+# internet_status view or the partitions covering the range (see status_db.partition_source).
+# Databases from before the ts_ms column are read with unmigrated_status_query
+STATUS_QUERY_COLUMNS = """
         SELECT timestamp,
+               ts_ms,
                status AS status_message,
                success_percentage AS success,
                avg_latency_ms,
                max_latency_ms,
                min_latency_ms,
+               p50_latency_ms,
+               p95_latency_ms,
+               p99_latency_ms,
+               stddev_latency_ms,
+               jitter_ms,
                packet_loss
-        FROM internet_status
-        """
-        df = pd.read_sql_query(query, conn)
-        # Convert the 'timestamp' column to datetime type
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        # Ensure numeric columns are indeed numeric
-        numeric_columns = ['success', 'avg_latency_ms', 'max_latency_ms', 'min_latency_ms', 'packet_loss']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')  # Convert, setting errors to NaN
-        # Cap the values to prevent outliers
-        df['avg_latency_ms'] = df['avg_latency_ms'].clip(upper=500)  # Updated to 500ms as per user
-        df['max_latency_ms'] = df['max_latency_ms'].clip(upper=500)
-        df['min_latency_ms'] = df['min_latency_ms'].clip(upper=500)
-        df['packet_loss'] = df['packet_loss'].clip(upper=100)
+        FROM {source}
+"""
+
+# Raw rows grouped into buckets of :bucket ms in SQL. The bucket width is a
+# bound parameter so the statement text, and its cached prepared statement, stay the same
+GROUPED_STATUS_QUERY = """
+        SELECT ts_ms / :bucket * :bucket AS bucket_ms,
+               datetime(ts_ms / :bucket * :bucket / 1000, 'unixepoch', 'localtime') AS timestamp,
+               AVG(success_percentage) AS success,
+               AVG(avg_latency_ms) AS avg_latency_ms,
+               MAX(max_latency_ms) AS max_latency_ms,
+               MIN(min_latency_ms) AS min_latency_ms,
+               AVG(stddev_latency_ms) AS stddev_latency_ms,
+               AVG(jitter_ms) AS jitter_ms,
+               AVG(packet_loss) AS packet_loss,
+               SUM(success_percentage = 100) AS full_up_count,
+               SUM(success_percentage > 0 AND success_percentage < 100) AS partial_up_count,
+               SUM(success_percentage = 0) AS down_count
+        FROM {source}
+        WHERE ts_ms BETWEEN :start AND :end
+        GROUP BY 1
+        ORDER BY 1
+"""
+
+# Rollup tier buckets merged into buckets of :bucket ms (a multiple of the tier's grain)
+GROUPED_ROLLUP_QUERY = """
+        SELECT bucket_ms / :bucket * :bucket AS bucket_ms,
+               datetime(bucket_ms / :bucket * :bucket / 1000, 'unixepoch', 'localtime') AS timestamp,
+               SUM(success_sum) / SUM(samples) AS success,
+               SUM(avg_latency_sum) / SUM(latency_count) AS avg_latency_ms,
+               MAX(max_latency_ms) AS max_latency_ms,
+               MIN(min_latency_ms) AS min_latency_ms,
+               SUM(stddev_latency_sum) / SUM(latency_count) AS stddev_latency_ms,
+               SUM(jitter_sum) / SUM(latency_count) AS jitter_ms,
+               SUM(packet_loss_sum) / SUM(samples) AS packet_loss,
+               SUM(full_up_count) AS full_up_count,
+               SUM(partial_up_count) AS partial_up_count,
+               SUM(down_count) AS down_count
+        FROM {table}
+        WHERE bucket_ms BETWEEN :start AND :end
+        GROUP BY 1
+        ORDER BY 1
+"""
+
+# Graphs are ~1500 px wide, so more points than this can't be told apart
+GRAPH_POINT_BUDGET = 1500
+
+# Points sent per graph trace; LTTB keeps the line's shape well below one
+# point per pixel, and outage points are always sent on top of this
+TRACE_POINT_BUDGET = int(os.environ.get('TRACE_POINT_BUDGET', 1000))
+
+# Points a patched trace may gain over what its last full draw sent before the
+# graphs are redrawn (and downsampled) again, since patches append every new row
+PATCH_POINT_MARGIN = TRACE_POINT_BUDGET // 10
+
+# Raw rows are one check cycle (a minute) apart, so raw buckets are whole minutes
+RAW_BUCKET_GRAIN_MS = 60 * 1000
+
+# How a time range is read: from `table` (None for raw internet_status rows),
+# grouped into `bucket_ms` wide buckets (None for one point per raw row)
+QueryPlan = namedtuple('QueryPlan', ['table', 'bucket_ms'])
+
+# Function to plan how to read a time range within a point budget
+def plan_series_query(conn, start_ms, end_ms, point_budget=GRAPH_POINT_BUDGET):
+    """
+    Returns the QueryPlan for [start_ms, end_ms]. Raw rows are used as they
+    are when they fit the budget. Otherwise the range is cut into equal,
+    epoch-anchored buckets (so refreshes keep the same bucket edges) and
+    read from the coarsest source whose grain divides the bucket width.
+    """
+    source = status_db.partition_source(conn, 'internet_status', start_ms, end_ms)
+    rows = conn.execute(f"SELECT COUNT(*) FROM {source} WHERE ts_ms BETWEEN ? AND ?", (start_ms, end_ms)).fetchone()[0]
+    if rows <= point_budget:
+        return QueryPlan(None, None)
+
+    # point_budget - 1 full buckets span the range; the two ends may be partial buckets
+    bucket_ms = -(-(end_ms - start_ms) // (point_budget - 1))
+    grain = RAW_BUCKET_GRAIN_MS
+    for _, tier_ms in status_db.ROLLUP_TIERS:
+        if tier_ms <= bucket_ms:
+            grain = tier_ms
+    bucket_ms = -(-bucket_ms // grain) * grain
+
+    table = None
+    for tier, tier_ms in status_db.ROLLUP_TIERS:
+        if bucket_ms % tier_ms == 0:
+            table = tier
+    return QueryPlan(table, bucket_ms)
+
+# Function to merge the latency sketches of each bucket in a plan
+def get_bucket_sketches(conn, plan, start_ms, end_ms):
+    """
+    Returns {bucket_ms: LatencySketch}. SQL can't merge sketches, so the
+    blobs are read in bucket order and merged here.
+    """
+    if plan.table is None:
+        key, source = 'ts_ms', status_db.partition_source(conn, 'internet_status', start_ms, end_ms)
+    else:
+        key, source = 'bucket_ms', plan.table
+    rows = conn.execute(
+        f"""
+        SELECT {key} / :bucket * :bucket, latency_sketch
+        FROM {source}
+        WHERE {key} BETWEEN :start AND :end AND latency_sketch IS NOT NULL
+        ORDER BY 1
+        """,
+        {'bucket': plan.bucket_ms, 'start': start_ms, 'end': end_ms},
+    )
+    return {bucket: merge_sketches(blob for _, blob in blobs)
+            for bucket, blobs in itertools.groupby(rows, key=lambda row: row[0])}
+
+# Function to add the status count columns to raw rows
+def add_status_counts(df):
+    """
+    Each raw row counts once towards the status totals; buckets carry the
+    counts of every cycle they cover.
+    """
+    df = df.copy()
+    df['full_up_count'] = (df['success'] == 100).astype(int)
+    df['partial_up_count'] = ((df['success'] > 0) & (df['success'] < 100)).astype(int)
+    df['down_count'] = (df['success'] == 0).astype(int)
+    return df
+
+# Function to read a time range following a query plan
+def read_series(conn, plan, start_ms, end_ms):
+    """
+    Reads [start_ms, end_ms] as one point per raw row or per bucket.
+    `ts_ms` is the row time or the bucket start.
+    """
+    source = status_db.partition_source(conn, 'internet_status', start_ms, end_ms)
+    if plan.bucket_ms is None:
+        query = STATUS_QUERY_COLUMNS.format(source=source) + "        WHERE ts_ms BETWEEN ? AND ?\n        ORDER BY ts_ms"
+        df = add_status_counts(pd.read_sql_query(query, conn, params=(start_ms, end_ms)))
+    else:
+        if plan.table is None:
+            query = GROUPED_STATUS_QUERY.format(source=source)
+        else:
+            query = GROUPED_ROLLUP_QUERY.format(table=plan.table)
+        df = pd.read_sql_query(query, conn, params={'bucket': plan.bucket_ms, 'start': start_ms, 'end': end_ms})
+        df = df.rename(columns={'bucket_ms': 'ts_ms'})
+        # Bucket percentiles come from the merged sketch of all cycles in the bucket
+        sketches = get_bucket_sketches(conn, plan, start_ms, end_ms)
+        for p in (50, 95, 99):
+            df[f'p{p}_latency_ms'] = [sketches[bucket].quantile(p / 100) if bucket in sketches else None
+                                      for bucket in df['ts_ms']]
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df
+
+# Function to read a time range as a series of at most point_budget points
+def query_series(conn, start_ms, end_ms, point_budget=GRAPH_POINT_BUDGET):
+    """
+    Reads [start_ms, end_ms] following plan_series_query, so the number of
+    points (and the callback payload) stays bounded however long the range
+    or the retention is. Bucketed ranges start at a bucket edge, so the
+    first bucket is whole. Returns (DataFrame, plan).
+    """
+    plan = plan_series_query(conn, start_ms, end_ms, point_budget)
+    if plan.bucket_ms is not None:
+        start_ms = start_ms // plan.bucket_ms * plan.bucket_ms
+    return read_series(conn, plan, start_ms, end_ms), plan
+
+# Function to find the epoch-ms bounds of the selected date range
+def get_range_bounds(conn, date_range):
+    """
+    Returns (start_ms, end_ms); 'all_time' starts at the oldest row.
+    """
+    start_ms = get_start_ms(date_range)
+    if start_ms is None:
+        start_ms = conn.execute("SELECT MIN(ts_ms) FROM internet_status").fetchone()[0] or 0
+    return start_ms, int(time.time() * 1000)
+
+# Read-only connections kept open per worker thread (sqlite3 connections can't be shared
+# between threads, nor between processes after a fork), keyed by database path
+_connections = threading.local()
+
+# Function to get this thread's pooled connection to the database
+def get_connection(db_path):
+    """
+    Returns (connection, ms spent connecting). The first call on a thread
+    opens a read-only connection; later calls reuse it, along with its
+    cache of prepared statements, and report 0 ms.
+    """
+    if getattr(_connections, 'pid', None) != os.getpid():
+        _connections.pid = os.getpid()
+        _connections.by_path = {}
+    conn = _connections.by_path.get(db_path)
+    if conn is not None:
+        return conn, 0.0
+    started = time.perf_counter()
+    conn = status_db.open_db_readonly(db_path)
+    _connections.by_path[db_path] = conn
+    return conn, (time.perf_counter() - started) * 1000
+
+# Function to drop this thread's pooled connection after an error
+def discard_connection(db_path):
+    conn = getattr(_connections, 'by_path', {}).pop(db_path, None)
+    if conn is not None:
         conn.close()
-        logger.info("Data parsed successfully from the database.")
+
+# Function to coerce the graphed columns to numbers and cap outliers
+def clean_series(df):
+    # Ensure numeric columns are indeed numeric
+    numeric_columns = ['success', 'packet_loss'] + LATENCY_COLUMNS
+    for col in numeric_columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')  # Convert, setting errors to NaN
+    # Cap the values to prevent outliers
+    for col in LATENCY_COLUMNS:
+        df[col] = df[col].clip(upper=500)  # Updated to 500ms as per user
+    df['packet_loss'] = df['packet_loss'].clip(upper=100)
+    return df
+
+# Function to build the dashboard's SELECT for a database the checker hasn't migrated yet
+def unmigrated_status_query(conn):
+    """
+    Returns the columns of STATUS_QUERY_COLUMNS from internet_status as it
+    is, with NULL in place of each one the table doesn't have yet (a
+    database from the original shell script has none of the newer metrics).
+    """
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(internet_status)")}
+    aliases = {'status': 'status_message', 'success_percentage': 'success'}
+    columns = ['timestamp', 'NULL AS ts_ms']
+    for col in ['status', 'success_percentage'] + LATENCY_COLUMNS + ['packet_loss']:
+        columns.append(f"{col if col in existing else 'NULL'} AS {aliases.get(col, col)}")
+    return "SELECT " + ", ".join(columns) + " FROM internet_status"
+
+# Function to read and parse data from the SQLite database
+def parse_log(db_path, date_range='all_time', point_budget=GRAPH_POINT_BUDGET, previous=None):
+    """
+    Fetches the records in the selected date range through query_series, so
+    the range is pushed down into SQL and long ranges come back as at most
+    point_budget buckets. The query plan is kept in df.attrs['plan'].
+
+    `previous` is an earlier result for the same range. If it was read with
+    the same plan, only rows after its newest ts_ms (or its last bucket,
+    which may still be filling up) are read and appended, and rows that
+    have fallen out of the window are trimmed, so a refresh costs as much as
+    the new data rather than the whole range.
+
+    Databases the checker has not migrated yet (no ts_ms column) are read in
+    full through unmigrated_status_query and filtered in pandas instead.
+    """
+    try:
+        conn, connect_ms = get_connection(db_path)
+        started = time.perf_counter()
+        try:
+            start_ms, end_ms = get_range_bounds(conn, date_range)
+            plan = plan_series_query(conn, start_ms, end_ms, point_budget)
+            source = plan.table or 'internet_status'
+            if plan.bucket_ms is not None:
+                source += f" in {plan.bucket_ms // 1000} s buckets"
+                start_ms = start_ms // plan.bucket_ms * plan.bucket_ms
+            if previous is not None and not previous.empty and previous.attrs.get('plan') == plan:
+                last_ms = int(previous['ts_ms'].iloc[-1])
+                resume_ms = last_ms + 1 if plan.bucket_ms is None else last_ms
+                kept = previous[(previous['ts_ms'] >= start_ms) & (previous['ts_ms'] < resume_ms)]
+                new = read_series(conn, plan, resume_ms, end_ms)
+                # An empty read has object columns, which would spoil the dtypes of the kept rows
+                df = pd.concat([kept, new], ignore_index=True) if not new.empty else kept.reset_index(drop=True)
+                source += f", {int((previous['ts_ms'] < start_ms).sum())} trimmed, {len(df) - len(kept)} read"
+            else:
+                df = read_series(conn, plan, start_ms, end_ms)
+        except (pd.errors.DatabaseError, sqlite3.OperationalError) as e:
+            logger.warning(f"Range query failed ({e}), falling back to filtering in pandas")
+            source, plan = 'internet_status (unmigrated)', None
+            df = pd.read_sql_query(unmigrated_status_query(conn), conn)
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df = add_status_counts(filter_data_by_date(df, date_range))
+        query_ms = (time.perf_counter() - started) * 1000
+
+        df = clean_series(df)
+        df.attrs['plan'] = plan
+        logger.info(f"Parsed {len(df)} rows from {source} for date range: {date_range} "
+                    f"(connect {connect_ms:.1f} ms, query {query_ms:.1f} ms)")
         return df
     except Exception as e:
         logger.error(f"Error parsing log: {e}")
+        discard_connection(db_path)
         return pd.DataFrame()  # Return empty DataFrame on error
 
+# Length of each selectable date range ('all_time' has no limit)
+DATE_RANGE_DURATIONS = {
+    'last_12_hours': datetime.timedelta(hours=12),
+    'last_24_hours': datetime.timedelta(hours=24),
+    'last_48_hours': datetime.timedelta(hours=48),
+    'last_7_days': datetime.timedelta(days=7),
+}
+
+# Function to find the start of the selected date range
+def get_start_date(date_range):
+    """
+    Returns the earliest timestamp in the selected date range, or None for 'all_time'.
+    """
+    duration = DATE_RANGE_DURATIONS.get(date_range)
+    if duration is None:
+        return None
+    return pd.to_datetime(datetime.datetime.now()) - duration
+
+# Function to find the start of the selected date range as epoch milliseconds
+def get_start_ms(date_range):
+    """
+    Returns the start of the selected date range in epoch ms (for ts_ms range
+    scans), or None for 'all_time'.
+    """
+    duration = DATE_RANGE_DURATIONS.get(date_range)
+    if duration is None:
+        return None
+    return int((time.time() - duration.total_seconds()) * 1000)
+
 # Function to filter data based on the selected date range
 def filter_data_by_date(log_data, date_range):
     """
     Filters the log data based on the selected date range.
     """
-    now = pd.to_datetime(datetime.datetime.now())
-
-    if date_range == 'last_12_hours':
-        start_date = now - pd.DateOffset(hours=12)
-    elif date_range == 'last_24_hours':
-        start_date = now - pd.DateOffset(hours=24)
-    elif date_range == 'last_48_hours':
-        start_date = now - pd.DateOffset(hours=48)
-    elif date_range == 'last_7_days':
-        start_date = now - pd.DateOffset(days=7)
-    else:
+    start_date = get_start_date(date_range)
+    if start_date is None:
         return log_data  # For 'all_time', no filtering
 
     # Filter the data by the calculated date range
@@ -86,31 +391,321 @@ def filter_data_by_date(log_data, date_range):
     logger.info(f"Data filtered for date range: {date_range}")
     return filtered_data
 
-# Cached data fetching function with error handling
-@cache.memoize(timeout=300)  # Cache timeout of 5 minutes
-def get_filtered_data(db_path, date_range):
+# Columns kept in the cached dataset and sent to the graphs
+DATASET_COLUMNS = (['timestamp', 'ts_ms', 'success', 'packet_loss'] + LATENCY_COLUMNS
+                   + ['full_up_count', 'partial_up_count', 'down_count'])
+
+# Cached entries are checked against the data version on every read, so they
+# only need to expire once unused
+DATASET_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Function to read the database's data version (see status_db.data_version)
+def get_data_version(db_path):
+    """
+    Returns the change token cached results are tagged with, or None if it
+    can't be read (e.g. a database the checker hasn't migrated yet), in
+    which case cached results are never reused.
+    """
+    try:
+        conn, _ = get_connection(db_path)
+        return status_db.data_version(conn)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read data version: {e}")
+        discard_connection(db_path)
+        return None
+
+# Function to find the minute the selected date range currently starts at
+def get_window_start(date_range):
     """
-    Retrieves filtered data from the database, utilizing Redis for caching.
+    Returns get_start_ms floored to the minute, or None for 'all_time'.
+    Relative ranges move with the clock, so cached results are tagged with
+    this as well as the data version: rows that age out are trimmed every
+    minute even when the checker writes nothing new.
     """
+    start_ms = get_start_ms(date_range)
+    return None if start_ms is None else start_ms // 60000 * 60000
+
+# Functions to read and write the Redis cache without letting its errors reach the callbacks
+def cache_get(key):
     try:
-        df = parse_log(db_path)
-        if df.empty:
-            logger.warning("Parsed DataFrame is empty.")
-            return []
-        filtered_df = filter_data_by_date(df, date_range)
-        if filtered_df.empty:
-            logger.warning("Filtered DataFrame is empty after applying date range.")
-            return []
-        # Select only necessary columns for caching to reduce memory usage
-        columns_to_cache = ['timestamp', 'success', 'avg_latency_ms', 'max_latency_ms', 'min_latency_ms', 'packet_loss']
-        logger.info(f"Returning filtered data with {len(filtered_df)} records.")
-        return filtered_df[columns_to_cache].to_dict('records')
+        return cache.get(key)
     except Exception as e:
         logger.error(f"Redis Cache Error: {e}")
-        # Fallback to fetching data without caching
-        df = parse_log(db_path)
-        filtered_df = filter_data_by_date(df, date_range)
-        return filtered_df.to_dict('records') if not filtered_df.empty else []
+        return None
+
+def cache_set(key, value):
+    try:
+        cache.set(key, value, timeout=DATASET_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Redis Cache Error: {e}")
+
+# Cached data fetching function with error handling
+def get_filtered_data(db_path, date_range, version=None, window=None):
+    """
+    Retrieves filtered data from the database as a DataFrame. The last
+    result for each range is kept in Redis, packed column by column (see
+    frame_codec), with its query plan and the data version and window start
+    (see get_window_start) it was read at. If neither has changed it is
+    returned as is; otherwise it is extended with only the rows written
+    since and trimmed to the window (see parse_log's `previous`).
+    """
+    key = f"filtered-data:{db_path}:{date_range}"
+    previous = None
+    cached = cache_get(key)
+    if cached is not None:
+        previous = unpack_frame(cached['frame'])
+        previous.attrs['plan'] = cached['plan']
+        if version is not None and cached['version'] == version and cached.get('window') == window:
+            logger.info(f"Returning cached data with {len(previous)} records (version {version}).")
+            return previous
+
+    filtered_df = parse_log(db_path, date_range, previous=previous)
+    if filtered_df.empty:
+        logger.warning("Parsed DataFrame is empty for the selected date range.")
+        return pd.DataFrame(columns=DATASET_COLUMNS)
+    # Select only necessary columns for caching to reduce memory usage
+    plan = filtered_df.attrs['plan']
+    filtered_df = filtered_df[DATASET_COLUMNS]
+    filtered_df.attrs['plan'] = plan
+    cache_set(key, {'version': version, 'window': window, 'plan': plan, 'frame': pack_frame(filtered_df)})
+    logger.info(f"Returning filtered data with {len(filtered_df)} records.")
+    return filtered_df
+
+# Latency percentiles over the whole selected range, cached per data version
+def get_range_percentiles(db_path, date_range, version=None, window=None):
+    """
+    Merges the latency sketches in the selected date range and returns the
+    true p50/p95/p99 over it (averaging per-cycle percentiles would not give
+    meaningful tail numbers). Long ranges merge the sketches of the rollup
+    tier the graphs are read from, so the partial bucket at the range start
+    is left out.
+    """
+    key = f"range-percentiles:{db_path}:{date_range}"
+    cached = cache_get(key)
+    if (cached is not None and version is not None and cached['version'] == version
+            and cached.get('window') == window):
+        return cached['percentiles']
+    try:
+        conn, connect_ms = get_connection(db_path)
+        started = time.perf_counter()
+        start_ms, end_ms = get_range_bounds(conn, date_range)
+        table = plan_series_query(conn, start_ms, end_ms).table
+        if table is None:
+            source = status_db.partition_source(conn, 'internet_status', start_ms, end_ms)
+            query = f"SELECT latency_sketch FROM {source} WHERE ts_ms BETWEEN ? AND ? AND latency_sketch IS NOT NULL"
+        else:
+            query = f"SELECT latency_sketch FROM {table} WHERE bucket_ms BETWEEN ? AND ? AND latency_sketch IS NOT NULL"
+        sketch = merge_sketches(blob for (blob,) in conn.execute(query, (start_ms, end_ms)))
+        logger.info(f"Merged range latency sketches for date range: {date_range} "
+                    f"(connect {connect_ms:.1f} ms, query {(time.perf_counter() - started) * 1000:.1f} ms)")
+        percentiles = {f'p{p}': sketch.quantile(p / 100) for p in (50, 95, 99)}
+        cache_set(key, {'version': version, 'window': window, 'percentiles': percentiles})
+        return percentiles
+    except Exception as e:
+        logger.error(f"Error merging latency sketches: {e}")
+        discard_connection(db_path)
+        return {}
+
+# Function to read the part of the range the graphs are zoomed into
+def get_zoomed_data(db_path, start_ms, end_ms):
+    """
+    Re-queries only [start_ms, end_ms] with the same point budget as a full
+    range, so zooming in on a rolled-up view brings back finer buckets and,
+    once the window holds fewer cycles than the budget, the raw per-minute
+    rows. Returns an empty DataFrame if the window can't be read.
+    """
+    try:
+        conn, connect_ms = get_connection(db_path)
+        started = time.perf_counter()
+        df, plan = query_series(conn, start_ms, end_ms)
+        query_ms = (time.perf_counter() - started) * 1000
+    except (pd.errors.DatabaseError, sqlite3.Error) as e:
+        logger.error(f"Error reading zoomed range: {e}")
+        discard_connection(db_path)
+        return pd.DataFrame(columns=DATASET_COLUMNS)
+    logger.info(f"Read {len(df)} points for zoomed range from {plan.table or 'internet_status'} "
+                f"(connect {connect_ms:.1f} ms, query {query_ms:.1f} ms)")
+    return clean_series(df)[DATASET_COLUMNS]
+
+# Function to read a zoom or reset out of a graph's relayoutData
+def parse_relayout(relayout_data):
+    """
+    Returns (start_ms, end_ms) for a new x-axis range, 'reset' when the
+    x-axis went back to autorange, or None for anything else (y-axis only,
+    autosize, drag mode changes). Axis values are local time, like the
+    timestamps plotted.
+    """
+    relayout_data = relayout_data or {}
+    if relayout_data.get('xaxis.autorange'):
+        return 'reset'
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        bounds = relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    elif 'xaxis.range' in relayout_data:
+        bounds = relayout_data['xaxis.range']
+    else:
+        return None
+    start_ms, end_ms = sorted(int(pd.Timestamp(value).to_pydatetime().timestamp() * 1000) for value in bounds)
+    return start_ms, end_ms
+
+# Log table columns: (column id, header, internet_status column, DataTable type). The
+# type decides how the table parses filters: `> 50` only reaches SQL as a number on numeric columns
+LOG_TABLE_COLUMNS = [
+    ('timestamp', 'Timestamp', 'timestamp', 'text'),
+    ('status_message', 'Status', 'status', 'text'),
+    ('success', 'Success (%)', 'success_percentage', 'numeric'),
+    ('avg_latency_ms', 'Avg Latency (ms)', 'avg_latency_ms', 'numeric'),
+    ('max_latency_ms', 'Max Latency (ms)', 'max_latency_ms', 'numeric'),
+    ('min_latency_ms', 'Min Latency (ms)', 'min_latency_ms', 'numeric'),
+    ('packet_loss', 'Packet Loss (%)', 'packet_loss', 'numeric'),
+]
+
+# DataTable filter operators and their SQL equivalents
+FILTER_OPERATORS = [
+    ('>=', '>='), ('<=', '<='), ('!=', '!='), ('>', '>'), ('<', '<'), ('=', '='),
+    ('ge ', '>='), ('le ', '<='), ('ne ', '!='), ('gt ', '>'), ('lt ', '<'), ('eq ', '='),
+    ('contains ', 'contains'), ('datestartswith ', 'datestartswith'),
+]
+
+# Function to translate a DataTable filter_query into SQL conditions
+def filter_query_to_sql(filter_query):
+    """
+    Returns (conditions, params) for queries like
+    "{success} < 100 && {status_message} contains down". Only known
+    columns are accepted; anything that doesn't parse is ignored.
+    """
+    sql_columns = {column_id: column for column_id, _, column, _ in LOG_TABLE_COLUMNS}
+    conditions, params = [], []
+    for part in (filter_query or '').split(' && '):
+        part = part.strip()
+        if not part.startswith('{') or '}' not in part:
+            continue
+        column_id, rest = part[1:].split('}', 1)
+        column = sql_columns.get(column_id)
+        rest = rest.strip()
+        for operator, sql_operator in FILTER_OPERATORS:
+            if column and rest.startswith(operator):
+                value = rest[len(operator):].strip()
+                if value[:1] == value[-1:] and value[:1] in ('"', "'", '`'):
+                    value = value[1:-1]
+                elif sql_operator not in ('contains', 'datestartswith'):
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        pass
+                if sql_operator == 'contains':
+                    conditions.append(f"{column} LIKE '%' || ? || '%'")
+                elif sql_operator == 'datestartswith':
+                    conditions.append(f"{column} LIKE ? || '%'")
+                else:
+                    conditions.append(f"{column} {sql_operator} ?")
+                params.append(value)
+                break
+    return conditions, params
+
+# Function to read one page of raw rows for the log table
+def query_log_page(db_path, date_range, page, page_size, sort_by=None, filter_query=''):
+    """
+    Returns (records, page count) for the raw internet_status rows in the
+    selected range, newest first unless `sort_by` says otherwise. Only the
+    requested page is read (LIMIT/OFFSET over the ts_ms index), so a page
+    costs the same for 12 hours as for the whole retention.
+    """
+    conn, _ = get_connection(db_path)
+    start_ms, end_ms = get_range_bounds(conn, date_range)
+    source = status_db.partition_source(conn, 'internet_status', start_ms, end_ms)
+    conditions, params = filter_query_to_sql(filter_query)
+    where = " AND ".join(["ts_ms BETWEEN ? AND ?"] + conditions)
+    params = [start_ms, end_ms] + params
+
+    order = "ts_ms DESC"
+    if sort_by:
+        sql_columns = {column_id: column for column_id, _, column, _ in LOG_TABLE_COLUMNS}
+        column = sql_columns.get(sort_by[0]['column_id'])
+        if column == 'timestamp':
+            column = 'ts_ms'  # Same order, but served by the index
+        if column:
+            order = f"{column} {'ASC' if sort_by[0]['direction'] == 'asc' else 'DESC'}, ts_ms DESC"
+
+    total = conn.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", params).fetchone()[0]
+    columns = ", ".join(f"{column} AS {column_id}" for column_id, _, column, _ in LOG_TABLE_COLUMNS)
+    rows = conn.execute(
+        f"SELECT {columns} FROM {source} WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+        params + [page_size, page * page_size]
+    )
+    names = [column_id for column_id, _, _, _ in LOG_TABLE_COLUMNS]
+    records = [dict(zip(names, row)) for row in rows]
+    return records, max(math.ceil(total / page_size), 1)
+
+# Function to downsample one graph trace to TRACE_POINT_BUDGET points
+def trace_points(df, column, budget=TRACE_POINT_BUDGET):
+    """
+    Returns (x, y) for plotting df[column] over time. Points covering a down
+    cycle and gaps (NaN) are always kept, so outage dips and breaks in the
+    line survive downsampling.
+    """
+    x = df['timestamp'].to_numpy().view('int64')
+    y = df[column].to_numpy(dtype='float64', na_value=float('nan'))
+    keep = (df['down_count'].to_numpy() > 0) | pd.isna(y)
+    indices = downsample_trace(x, y, budget, keep)
+    return df['timestamp'].iloc[indices], df[column].iloc[indices]
+
+# Function to turn plotted timestamps into sortable epoch-style integers (ms)
+def timestamp_ms(timestamps):
+    return np.asarray(timestamps, dtype='datetime64[ms]').view('int64')
+
+# Function to bring one drawn trace up to date through a Patch
+def patch_trace(trace, drawn, df, column, refresh_last):
+    """
+    Adds to `trace` (a Patch of one figure trace) the removal of the drawn
+    points older than df's first row, a new value for the last drawn point
+    if `refresh_last` (a bucket that was still filling up) and the rows
+    after it. `drawn` holds the timestamps currently plotted (timestamp_ms).
+    Returns the timestamps plotted afterwards, or None if none of the drawn
+    points are left to build on.
+    """
+    times = timestamp_ms(df['timestamp'])
+    expired = int(np.searchsorted(drawn, times[0]))
+    if expired == len(drawn):
+        return None
+    for _ in range(expired):
+        del trace['x'][0]
+        del trace['y'][0]
+    drawn = drawn[expired:]
+    position = int(np.searchsorted(times, drawn[-1]))
+    if refresh_last and position < len(times) and times[position] == drawn[-1]:
+        trace['y'][len(drawn) - 1] = df[column].iloc[position]
+    new = times > drawn[-1]
+    if new.any():
+        trace['x'].extend(df['timestamp'][new].tolist())
+        trace['y'].extend(df[column][new].tolist())
+    return np.concatenate([drawn, times[new]])
+
+# Function to update the drawn figures in place instead of redrawing them
+def patch_figures(drawn, df, selected_latency_metrics, latency_y_range, packetloss_y_range):
+    """
+    Returns Patches for the success, latency and packet loss figures that
+    drop expired points, append the new rows and move the axes, so a
+    refresh sends only what changed. `drawn` is the record saved by the
+    last full draw (see update_dashboard) and is updated in place. Returns
+    None when a full redraw is needed instead, including once a trace has
+    grown past drawn['point_limit'].
+    """
+    refresh_last = drawn['plan'].bucket_ms is not None
+    figures = {'success': dash.Patch(), 'latency': dash.Patch(), 'packetloss': dash.Patch()}
+    traces = [('success', 0, 'success', 'success'), ('packetloss', 0, 'packet_loss', 'packet_loss')]
+    traces += [('latency', i, metric, metric) for i, metric in enumerate(LATENCY_COLUMNS)]
+    for figure, index, column, key in traces:
+        times = patch_trace(figures[figure]['data'][index], drawn['traces'][key], df, column, refresh_last)
+        if times is None or len(times) > drawn['point_limit']:
+            return None
+        drawn['traces'][key] = times
+    x_range = [df['timestamp'].min(), df['timestamp'].max()]
+    for patch in figures.values():
+        patch['layout']['xaxis']['range'] = x_range
+    if selected_latency_metrics:
+        figures['latency']['layout']['yaxis']['range'] = latency_y_range
+    figures['packetloss']['layout']['yaxis']['range'] = [0, packetloss_y_range[1]]
+    return figures['success'], figures['latency'], figures['packetloss']
 
 # Function to calculate dynamic y-axis range with buffer and capping
 def calculate_y_range(data_series, absolute_max, buffer_ratio=0.1):
@@ -168,8 +763,12 @@ app.layout = html.Div([
         )
     ], style={'backgroundColor': '#121212', 'padding': '10px', 'border-radius': '8px'}),
 
-    # Store for filtered data
-    dcc.Store(id='filtered-data'),
+    # Handle of the filtered data ({'date_range', 'version'}); the data itself stays in the server-side cache
+    dcc.Store(id='dataset-handle'),
+    # The x-range the graphs are zoomed into, re-queried at its own resolution
+    dcc.Store(id='graph-zoom'),
+    # Id of the server-side record of what the graphs show, for Patch updates
+    dcc.Store(id='graph-drawn'),
 
     # Status counts section
     html.Div([
@@ -191,6 +790,11 @@ app.layout = html.Div([
                 {'label': 'Average Latency (ms)', 'value': 'avg_latency_ms'},
                 {'label': 'Maximum Latency (ms)', 'value': 'max_latency_ms'},
                 {'label': 'Minimum Latency (ms)', 'value': 'min_latency_ms'},
+                {'label': 'Median Latency (ms)', 'value': 'p50_latency_ms'},
+                {'label': 'P95 Latency (ms)', 'value': 'p95_latency_ms'},
+                {'label': 'P99 Latency (ms)', 'value': 'p99_latency_ms'},
+                {'label': 'Latency Std Dev (ms)', 'value': 'stddev_latency_ms'},
+                {'label': 'Jitter (ms)', 'value': 'jitter_ms'},
             ],
             value=['avg_latency_ms', 'max_latency_ms', 'min_latency_ms'],  # Default selected
             labelStyle={'display': 'inline-block', 'margin-right': '10px', 'color': '#ffffff'},
@@ -200,6 +804,11 @@ app.layout = html.Div([
 
     dcc.Loading(dcc.Graph(id="latency-graph"), type="default"),
 
+    # Latency percentiles across the whole selected range
+    html.Div([
+        html.H4(id="range-percentiles", style={'color': '#ffcc00'})
+    ], style={'textAlign': 'center', 'backgroundColor': '#1e1e1e', 'padding': '10px', 'border-radius': '8px', 'margin-top': '10px'}),
+
     html.Div([], style={'backgroundColor': '#121212', 'padding': '10px', 'border-radius': '8px', 'margin-top': '10px'}),
 
     dcc.Loading(dcc.Graph(id="packetloss-graph"), type="default"),
@@ -210,34 +819,126 @@ app.layout = html.Div([
         dcc.Loading(
             dash_table.DataTable(
                 id='log-table',
+                columns=[{'name': name, 'id': column_id, 'type': column_type}
+                         for column_id, name, _, column_type in LOG_TABLE_COLUMNS],
                 style_table={'overflowX': 'auto', 'backgroundColor': '#333', 'color': '#fff'},
                 style_cell={'textAlign': 'left', 'backgroundColor': '#333', 'color': '#fff'},
                 page_size=10,
+                # Paging, sorting and filtering run as SQL in update_log_table
+                page_current=0,
+                page_action='custom',
+                sort_action='custom',
+                sort_mode='single',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
             ),
             type="default"
         )
     ], style={'margin-top': '20px', 'backgroundColor': '#1e1e1e', 'padding': '10px', 'border-radius': '8px'}),
 
-    # Interval for refreshing the data every 30 minutes
+    # Set from the browser (assets/dashboard.js) whenever the checker announces a new cycle
+    dcc.Store(id='live-cycle'),
+
+    # Fallback check for new data, for when live push is unavailable (no Redis, or the stream dropped)
     dcc.Interval(
         id='interval-component',
-        interval=30 * 60 * 1000,  # 30 minutes in milliseconds
+        interval=5 * 60 * 1000,  # 5 minutes in milliseconds
         n_intervals=0
     )
 ], style={'backgroundColor': '#121212', 'padding': '20px'})
 
-# Callback to fetch and store filtered data
+# Callback to point the dataset handle at the selected range and the current data version
 @app.callback(
-    Output('filtered-data', 'data'),
+    Output('dataset-handle', 'data'),
     [
         Input('interval-component', 'n_intervals'),
-        Input('date-range-dropdown', 'value')
+        Input('date-range-dropdown', 'value'),
+        Input('live-cycle', 'data')
+    ],
+    State('dataset-handle', 'data')
+)
+def fetch_data(n, date_range, live_cycle, handle):
+    db_path = 'logs/internet_status.db'  # Ensure this path is correct
+    version = get_data_version(db_path)
+    window = get_window_start(date_range)
+    # Polls and announcements only move the handle (and redraw) when a new cycle has been
+    # written, or the range has moved on, since
+    if (dash.callback_context.triggered_id in ('interval-component', 'live-cycle') and handle
+            and version is not None and version == handle['version'] and window == handle.get('window')):
+        return dash.no_update
+    return {'date_range': date_range, 'version': version, 'window': window}
+
+# Callback to show latency percentiles over the selected range, whenever the dataset handle moves
+@app.callback(
+    Output('range-percentiles', 'children'),
+    Input('dataset-handle', 'data'),
+    prevent_initial_call=True
+)
+def update_range_percentiles(handle):
+    db_path = 'logs/internet_status.db'  # Ensure this path is correct
+    percentiles = get_range_percentiles(db_path, handle['date_range'], handle['version'], handle.get('window'))
+    if not percentiles or percentiles['p50'] is None:
+        return "Range Latency: no data"
+    return "Range Latency: " + " | ".join(f"{name.upper()} {value:.1f} ms" for name, value in percentiles.items())
+
+# Callback to fetch the visible page of the log table
+@app.callback(
+    [
+        Output('log-table', 'data'),
+        Output('log-table', 'page_count'),
+        Output('log-table', 'page_current')
+    ],
+    [
+        Input('dataset-handle', 'data'),
+        Input('date-range-dropdown', 'value'),
+        Input('log-table', 'page_current'),
+        Input('log-table', 'page_size'),
+        Input('log-table', 'sort_by'),
+        Input('log-table', 'filter_query')
     ]
 )
-def fetch_data(n, date_range):
+def update_log_table(handle, date_range, page_current, page_size, sort_by, filter_query):
+    """
+    Reads the page being viewed. A new date range or filter starts again
+    from the first page, which the old page number may lie beyond; new
+    data (a new dataset handle) keeps the page.
+    """
+    if not handle:
+        return [], 1, dash.no_update
+    page = dash.no_update
+    if dash.callback_context.triggered_id == 'date-range-dropdown' or (
+            'log-table.filter_query' in dash.callback_context.triggered_prop_ids):
+        page = page_current = 0
     db_path = 'logs/internet_status.db'  # Ensure this path is correct
-    filtered_data = get_filtered_data(db_path, date_range)
-    return filtered_data
+    try:
+        records, page_count = query_log_page(db_path, date_range or handle['date_range'], page_current or 0,
+                                             page_size, sort_by, filter_query)
+        return records, page_count, page
+    except sqlite3.Error as e:
+        logger.error(f"Error reading log table page: {e}")
+        discard_connection(db_path)
+        return [], 1, page
+
+# Callback to record a zoom (or reset) on any of the graphs
+@app.callback(
+    Output('graph-zoom', 'data'),
+    [
+        Input('success-graph', 'relayoutData'),
+        Input('latency-graph', 'relayoutData'),
+        Input('packetloss-graph', 'relayoutData')
+    ],
+    State('dataset-handle', 'data'),
+    prevent_initial_call=True
+)
+def update_zoom(success_relayout, latency_relayout, packetloss_relayout, handle):
+    zoom = parse_relayout(dash.callback_context.triggered[0]['value'])
+    if zoom is None or not handle:
+        return dash.no_update
+    if zoom == 'reset':
+        return None
+    # Tied to the date range, so picking another range shows all of it again
+    return {'date_range': handle['date_range'], 'start_ms': zoom[0], 'end_ms': zoom[1]}
 
 # Callback to update graphs and counts based on stored data and selected metrics
 @app.callback(
@@ -245,18 +946,24 @@ def fetch_data(n, date_range):
         Output('success-graph', 'figure'),
         Output('latency-graph', 'figure'),
         Output('packetloss-graph', 'figure'),
-        Output('log-table', 'data'),
         Output('full-up-count', 'children'),
         Output('partial-up-count', 'children'),
-        Output('down-count', 'children')
+        Output('down-count', 'children'),
+        Output('graph-drawn', 'data')
     ],
     [
-        Input('filtered-data', 'data'),
-        Input('latency-metrics-checkbox', 'value')  # New Input for selected metrics
+        Input('dataset-handle', 'data'),
+        Input('graph-zoom', 'data')
+    ],
+    [
+        State('latency-metrics-checkbox', 'value'),  # Toggling is handled by toggle_latency_metrics
+        State('graph-drawn', 'data')
     ]
 )
-def update_dashboard(filtered_data, selected_latency_metrics):
-    df = pd.DataFrame(filtered_data)
+def update_dashboard(handle, zoom, selected_latency_metrics, drawn_id=None):
+    db_path = 'logs/internet_status.db'  # Ensure this path is correct
+    # Resolved from the server-side cache, so the data never travels through the browser as JSON
+    df = get_filtered_data(db_path, handle['date_range'], handle['version'], handle.get('window')) if handle else pd.DataFrame()
 
     # Debug: Check the DataFrame
     logger.info("Update Dashboard Callback:")
@@ -271,11 +978,25 @@ def update_dashboard(filtered_data, selected_latency_metrics):
         success_fig = {}
         latency_fig = {}
         packetloss_fig = {}
-        table_data = []
         full_up_count = "Fully Up: 0"
         partial_up_count = "Partially Up: 0"
         down_count = "Down: 0"
-        return success_fig, latency_fig, packetloss_fig, table_data, full_up_count, partial_up_count, down_count
+        return success_fig, latency_fig, packetloss_fig, full_up_count, partial_up_count, down_count, None
+
+    # Calculate status counts over the whole range (rollup points carry the counts of every cycle they cover)
+    full_up_count = f"Fully Up: {int(df['full_up_count'].sum())}"
+    partial_up_count = f"Partially Up: {int(df['partial_up_count'].sum())}"
+    down_count = f"Down: {int(df['down_count'].sum())}"
+
+    # Zoomed in: graph only the visible window, read again at its own resolution.
+    # All three graphs follow, whichever one was zoomed.
+    x_range = [df['timestamp'].min(), df['timestamp'].max()]
+    zoomed_in = zoom and zoom['date_range'] == handle['date_range']
+    if zoomed_in:
+        x_range = [datetime.datetime.fromtimestamp(zoom[key] / 1000) for key in ('start_ms', 'end_ms')]
+        zoomed = get_zoomed_data(db_path, zoom['start_ms'], zoom['end_ms'])
+        if not zoomed.empty:
+            df = zoomed
 
     # Define absolute maximum limits
     ABSOLUTE_MAX_LATENCY = 500  # in milliseconds
@@ -296,13 +1017,26 @@ def update_dashboard(filtered_data, selected_latency_metrics):
     else:
         # If no metrics are selected, set y-axis to default or minimal range
         latency_y_range = [0, ABSOLUTE_MAX_LATENCY]  # Alternatively, set to [0,1]
+    packetloss_y_range = calculate_y_range(df['packet_loss'], ABSOLUTE_MAX_PACKET_LOSS)
+
+    # A refresh with new rows for what is already drawn only sends the difference
+    if drawn_id and not zoomed_in and dash.callback_context.triggered_id == 'dataset-handle':
+        drawn = cache_get(f"graph-drawn:{drawn_id}")
+        if (drawn and drawn['date_range'] == handle['date_range']
+                and drawn['plan'] is not None and drawn['plan'] == df.attrs.get('plan')):
+            patched = patch_figures(drawn, df, selected_latency_metrics, latency_y_range, packetloss_y_range)
+            if patched is not None:
+                cache_set(f"graph-drawn:{drawn_id}", drawn)
+                logger.info("Patched the graphs with the new rows instead of redrawing them.")
+                return (*patched, full_up_count, partial_up_count, down_count, dash.no_update)
 
     # Success rate graph using Scattergl for better performance
+    success_x, success_y = trace_points(df, 'success')
     success_fig = {
         'data': [
             {
-                'x': df['timestamp'],
-                'y': df['success'],
+                'x': success_x,
+                'y': success_y,
                 'type': 'scattergl',  # Use Scattergl for better performance with large datasets
                 'mode': 'lines',
                 'name': 'Success Rate (%)',
@@ -320,7 +1054,7 @@ def update_dashboard(filtered_data, selected_latency_metrics):
             'xaxis': {
                 'title': 'Timestamp',
                 'color': '#ffffff',
-                'range': [df['timestamp'].min(), df['timestamp'].max()]
+                'range': x_range
             },
             'plot_bgcolor': '#1e1e1e',
             'paper_bgcolor': '#1e1e1e',
@@ -330,109 +1064,93 @@ def update_dashboard(filtered_data, selected_latency_metrics):
         }
     }
 
-    # Latency graph using Scattergl with dynamic y-axis range
-    if selected_latency_metrics:
-        # Prepare data traces based on selected metrics
-        latency_traces = []
-        color_mapping = {
-            'avg_latency_ms': '#ffcc00',
-            'max_latency_ms': '#ff6666',
-            'min_latency_ms': '#66ff66'
-        }
-        name_mapping = {
-            'avg_latency_ms': 'Avg Latency (ms)',
-            'max_latency_ms': 'Max Latency (ms)',
-            'min_latency_ms': 'Min Latency (ms)'
-        }
-        for metric in selected_latency_metrics:
-            latency_traces.append({
-                'x': df['timestamp'],
-                'y': df[metric],
-                'type': 'scattergl',
-                'mode': 'lines',
-                'name': name_mapping.get(metric, metric),
-                'line': {'color': color_mapping.get(metric, '#000000'), 'width': 2},
-                'marker': {'size': 5, 'symbol': 'circle'}
-            })
-    else:
-        latency_traces = []
+    # Latency graph using Scattergl with dynamic y-axis range. Every metric gets a
+    # trace and the checkbox only sets which are visible, so toggling a metric is
+    # handled in the browser (see assets/dashboard.js) without calling the server.
+    selected_latency_metrics = selected_latency_metrics or []
+    latency_traces = []
+    color_mapping = {
+        'avg_latency_ms': '#ffcc00',
+        'max_latency_ms': '#ff6666',
+        'min_latency_ms': '#66ff66',
+        'p50_latency_ms': '#00ccff',
+        'p95_latency_ms': '#ff9933',
+        'p99_latency_ms': '#cc66ff',
+        'stddev_latency_ms': '#999999',
+        'jitter_ms': '#ff66cc'
+    }
+    name_mapping = {
+        'avg_latency_ms': 'Avg Latency (ms)',
+        'max_latency_ms': 'Max Latency (ms)',
+        'min_latency_ms': 'Min Latency (ms)',
+        'p50_latency_ms': 'P50 Latency (ms)',
+        'p95_latency_ms': 'P95 Latency (ms)',
+        'p99_latency_ms': 'P99 Latency (ms)',
+        'stddev_latency_ms': 'Latency Std Dev (ms)',
+        'jitter_ms': 'Jitter (ms)'
+    }
+    for metric in LATENCY_COLUMNS:
+        metric_x, metric_y = trace_points(df, metric)
+        latency_traces.append({
+            'x': metric_x,
+            'y': metric_y,
+            'type': 'scattergl',
+            'mode': 'lines',
+            'name': name_mapping.get(metric, metric),
+            'meta': metric,  # Lets the clientside callback match traces to checkbox values
+            'visible': metric in selected_latency_metrics,
+            'line': {'color': color_mapping.get(metric, '#000000'), 'width': 2},
+            'marker': {'size': 5, 'symbol': 'circle'}
+        })
 
-    if selected_latency_metrics:
-        latency_fig = {
-            'data': latency_traces,
-            'layout': {
-                'title': 'Latency Over Time',
-                'yaxis': {
-                    'title': 'Latency (ms)',
-                    'range': latency_y_range,
-                    'color': '#ffffff'
-                },
-                'xaxis': {
-                    'title': 'Timestamp',
-                    'color': '#ffffff',
-                    'range': [df['timestamp'].min(), df['timestamp'].max()]
-                },
-                'plot_bgcolor': '#1e1e1e',
-                'paper_bgcolor': '#1e1e1e',
-                'font': {'color': '#ffffff'},
-                'titlefont': {'color': '#ffcc00'},
-                'legend': {
-                    'orientation': 'h',
-                    'x': 0,
-                    'y': -0.2
-                },
-                'hovermode': 'closest',
-            }
-        }
-    else:
-        # Display a placeholder message when no metrics are selected
-        latency_fig = {
-            'data': [],
-            'layout': {
-                'title': 'Latency Over Time',
-                'yaxis': {
-                    'title': 'Latency (ms)',
-                    'range': [0, ABSOLUTE_MAX_LATENCY],
-                    'color': '#ffffff'
-                },
-                'xaxis': {
-                    'title': 'Timestamp',
-                    'color': '#ffffff',
-                    'range': [df['timestamp'].min(), df['timestamp'].max()]
-                },
-                'annotations': [
-                    {
-                        'text': "Please select at least one latency metric to display.",
-                        'xref': "paper",
-                        'yref': "paper",
-                        'showarrow': False,
-                        'font': {
-                            'size': 16,
-                            'color': '#ffffff'
-                        }
+    latency_fig = {
+        'data': latency_traces,
+        'layout': {
+            'title': 'Latency Over Time',
+            'yaxis': {
+                'title': 'Latency (ms)',
+                'range': latency_y_range,
+                'color': '#ffffff'
+            },
+            'xaxis': {
+                'title': 'Timestamp',
+                'color': '#ffffff',
+                'range': x_range
+            },
+            # Placeholder message, shown when no metrics are selected
+            'annotations': [
+                {
+                    'text': "Please select at least one latency metric to display.",
+                    'xref': "paper",
+                    'yref': "paper",
+                    'showarrow': False,
+                    'visible': not selected_latency_metrics,
+                    'font': {
+                        'size': 16,
+                        'color': '#ffffff'
                     }
-                ],
-                'plot_bgcolor': '#1e1e1e',
-                'paper_bgcolor': '#1e1e1e',
-                'font': {'color': '#ffffff'},
-                'titlefont': {'color': '#ffcc00'},
-                'legend': {
-                    'orientation': 'h',
-                    'x': 0,
-                    'y': -0.2
-                },
-                'hovermode': 'closest',
-            }
+                }
+            ],
+            'plot_bgcolor': '#1e1e1e',
+            'paper_bgcolor': '#1e1e1e',
+            'font': {'color': '#ffffff'},
+            'titlefont': {'color': '#ffcc00'},
+            'legend': {
+                'orientation': 'h',
+                'x': 0,
+                'y': -0.2
+            },
+            'hovermode': 'closest',
         }
+    }
 
     # Packet Loss graph using Scattergl with dynamic y-axis range
-    packetloss_y_range = calculate_y_range(df['packet_loss'], ABSOLUTE_MAX_PACKET_LOSS)
-
+    packetloss_x, packetloss_y = trace_points(df, 'packet_loss')
     packetloss_fig = {
         'data': [
             {
-                'x': df['timestamp'],
-                'y': df['packet_loss'],
+                'x': packetloss_x,
+                'y': packetloss_y,
                 'type': 'scattergl',
                 'mode': 'lines',
                 'name': 'Packet Loss (%)',
@@ -450,7 +1168,7 @@ def update_dashboard(filtered_data, selected_latency_metrics):
             'xaxis': {
                 'title': 'Timestamp',
                 'color': '#ffffff',
-                'range': [df['timestamp'].min(), df['timestamp'].max()]
+                'range': x_range
             },
             'plot_bgcolor': '#1e1e1e',
             'paper_bgcolor': '#1e1e1e',
@@ -460,16 +1178,59 @@ def update_dashboard(filtered_data, selected_latency_metrics):
         }
     }
 
-    # Sort by the 'timestamp' in descending order for the table
-    filtered_data_sorted = df.sort_values(by='timestamp', ascending=False)
-    table_data = filtered_data_sorted.to_dict('records')
+    # Remember what was drawn, so the next refresh can patch it (not when zoomed, which is redrawn anyway)
+    drawn_id = None
+    if not zoomed_in:
+        drawn_id = uuid.uuid4().hex
+        traces = {'success': timestamp_ms(success_x), 'packet_loss': timestamp_ms(packetloss_x)}
+        for metric, trace in zip(LATENCY_COLUMNS, latency_traces):
+            traces[metric] = timestamp_ms(trace['x'])
+        point_limit = max(TRACE_POINT_BUDGET, *(len(times) for times in traces.values())) + PATCH_POINT_MARGIN
+        cache_set(f"graph-drawn:{drawn_id}", {'date_range': handle['date_range'], 'plan': df.attrs.get('plan'),
+                                              'traces': traces, 'point_limit': point_limit})
+
+    return success_fig, latency_fig, packetloss_fig, full_up_count, partial_up_count, down_count, drawn_id
+
+
+# New cycles announced by the checker, relayed to every open dashboard in this process
+cycle_feed = CycleFeed(REDIS_URL)
 
-    # Calculate status counts based on raw data
-    full_up_count = f"Fully Up: {df[df['success'] == 100].shape[0]}"
-    partial_up_count = f"Partially Up: {df[(df['success'] > 0) & (df['success'] < 100)].shape[0]}"
-    down_count = f"Down: {df[df['success'] == 0].shape[0]}"
+# Seconds between keep-alive comments on an idle event stream (they also reveal closed connections)
+EVENTS_KEEPALIVE_SECONDS = 25
 
-    return success_fig, latency_fig, packetloss_fig, table_data, full_up_count, partial_up_count, down_count
+# Server-sent events stream of new cycles, read by assets/dashboard.js
+@server.route('/events')
+def cycle_events():
+    if not cycle_feed.available:
+        return Response(status=204)  # Tells EventSource not to reconnect; the dashboard keeps polling
+    listener = cycle_feed.listen()
+
+    def stream():
+        try:
+            yield "retry: 10000\n\n"  # Reconnect after 10 s if the stream drops
+            while True:
+                try:
+                    data = listener.get(timeout=EVENTS_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: cycle\ndata: {data}\n\n"
+        finally:
+            cycle_feed.unlisten(listener)
+
+    # X-Accel-Buffering stops an nginx proxy from holding events back
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Clientside callback to show or hide latency traces when a metric is toggled,
+# rescaling the y-axis to the visible ones (assets/dashboard.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='toggleLatencyMetrics'),
+    Output('latency-graph', 'figure', allow_duplicate=True),
+    Input('latency-metrics-checkbox', 'value'),
+    State('latency-graph', 'figure'),
+    prevent_initial_call=True
+)
 
 
 @app.callback(
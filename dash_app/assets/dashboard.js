@@ -0,0 +1,54 @@
+// Clientside callbacks for the dashboard (Dash loads every file in assets/)
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        // Shows the latency traces whose metric is ticked and hides the rest,
+        // then rescales the y-axis to the visible traces, the way update_dashboard
+        // does on the server. Every metric's trace is already in the figure.
+        toggleLatencyMetrics: function(selectedMetrics, figure) {
+            if (!figure || !figure.data) {
+                return window.dash_clientside.no_update;
+            }
+            const ABSOLUTE_MAX_LATENCY = 500;  // Same cap as update_dashboard (ms)
+            const selected = selectedMetrics || [];
+
+            let maxLatency = -Infinity;
+            const data = figure.data.map(function(trace) {
+                const visible = selected.includes(trace.meta);
+                if (visible) {
+                    for (const value of trace.y || []) {
+                        if (value !== null && value > maxLatency) {
+                            maxLatency = value;
+                        }
+                    }
+                }
+                return Object.assign({}, trace, {visible: visible});
+            });
+
+            const range = Number.isFinite(maxLatency)
+                ? [0, Math.min(maxLatency * 1.1, ABSOLUTE_MAX_LATENCY)]
+                : [0, ABSOLUTE_MAX_LATENCY];
+            const layout = Object.assign({}, figure.layout, {
+                yaxis: Object.assign({}, figure.layout.yaxis, {range: range}),
+                // The "select a metric" placeholder
+                annotations: (figure.layout.annotations || []).map(function(annotation) {
+                    return Object.assign({}, annotation, {visible: selected.length === 0});
+                })
+            });
+            return Object.assign({}, figure, {data: data, layout: layout});
+        }
+    }
+});
+
+// Live push: the checker announces each new cycle and the server relays it on
+// /events. Setting the live-cycle store makes fetch_data pick the cycle up right
+// away instead of on the next poll. A 204 reply (Redis missing or unreachable)
+// closes the stream for good, leaving the interval poll to do the work.
+if (window.EventSource) {
+    const cycleEvents = new EventSource('/events');
+    cycleEvents.addEventListener('cycle', function(event) {
+        // set_props is defined once the Dash renderer has loaded
+        if (window.dash_clientside.set_props) {
+            window.dash_clientside.set_props('live-cycle', {data: JSON.parse(event.data)});
+        }
+    });
+}
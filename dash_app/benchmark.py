@@ -0,0 +1,271 @@
+"""
+Benchmarks for the dashboard data layer, run against a synthetic database.
+
+    python3 benchmark.py rows-read [--days 14]
+    python3 benchmark.py wal-stress [--days 14] [--seconds 30] [--readers 4] [--journal-mode wal]
+    python3 benchmark.py cache-format
+    python3 benchmark.py downsample
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import app
+from frame_codec import pack_frame, unpack_frame
+import status_db  # Importable once app has put scripts/ on the path
+from latency_sketch import LatencySketch
+
+
+# Function to build a synthetic status database with one row per minute
+def make_synthetic_db(path, days, outage_every=997):
+    """
+    Fills a status database with `days` of one-minute cycles ending now.
+    Every `outage_every`-th minute is a full outage so downsampling and
+    rollups have dips to preserve.
+    """
+    conn = status_db.open_db(path)
+    conn.execute("PRAGMA synchronous = OFF")
+    now = int(time.time()) // 60 * 60
+    rng = random.Random(42)
+    for minute in range(days * 1440):
+        scheduled_at = now - (days * 1440 - minute) * 60
+        status_db.insert_cycle(conn, scheduled_at, synthetic_row(rng, minute % outage_every == 0), {}, [], {})
+    conn.close()
+
+
+# Function to make up one cycle's summary row
+def synthetic_row(rng, down):
+    latency = None if down else rng.lognormvariate(3, 0.3)
+    sketch = None
+    if not down:
+        sketch = LatencySketch()
+        for _ in range(5):
+            sketch.add(latency * rng.uniform(0.7, 1.5))
+    return {
+        'status': "Internet is down (0% success)" if down else "Internet is fully up (100% success)",
+        'success_percentage': 0 if down else 100,
+        'avg_latency_ms': latency,
+        'max_latency_ms': latency and latency * 1.5,
+        'min_latency_ms': latency and latency * 0.7,
+        'p50_latency_ms': latency,
+        'p95_latency_ms': latency and latency * 1.3,
+        'p99_latency_ms': latency and latency * 1.45,
+        'stddev_latency_ms': latency and latency * 0.1,
+        'jitter_ms': latency and latency * 0.05,
+        'packet_loss': 100 if down else 0,
+        'latency_sketch': sketch and sketch.to_bytes(),
+    }
+
+
+def _time(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+# Function to compare rows read per view with and without the SQL range push-down
+def bench_rows_read(db_path):
+    """
+    For every date range, compares the old path (read the whole table, filter
+    in pandas) with the current one (query_series: ts_ms range scan, long
+    ranges bucketed to GRAPH_POINT_BUDGET points).
+    """
+    conn = sqlite3.connect(db_path)
+    print(f"{'date range':<16}{'source':<32}{'rows read (old)':>17}{'rows read (new)':>17}{'old ms':>10}{'new ms':>10}")
+    for date_range in ['last_12_hours', 'last_24_hours', 'last_48_hours', 'last_7_days', 'all_time']:
+        def old_path():
+            conn = sqlite3.connect(db_path)
+            df = pd.read_sql_query(app.STATUS_QUERY_COLUMNS.format(source='internet_status'), conn)
+            conn.close()
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            return len(df), app.filter_data_by_date(df, date_range)
+
+        (old_rows, old_df), old_ms = _time(old_path)
+        new_df, new_ms = _time(app.parse_log, db_path, date_range)
+        plan = app.plan_series_query(conn, *app.get_range_bounds(conn, date_range))
+        if plan.bucket_ms is None:
+            assert len(new_df) == len(old_df), "push-down changed the result"
+        else:
+            assert len(new_df) <= app.GRAPH_POINT_BUDGET, "bucketed series exceeds the point budget"
+        source = plan.table or 'internet_status'
+        if plan.bucket_ms is not None:
+            source += f" / {plan.bucket_ms // 60000} min"
+        print(f"{date_range:<16}{source:<32}{old_rows:>17}{len(new_df):>17}{old_ms:>10.1f}{new_ms:>10.1f}")
+    conn.close()
+
+
+def _stress_writer(db_path, seconds, interval, results):
+    # Not open_db, which would switch the database back to WAL
+    conn = sqlite3.connect(db_path, timeout=status_db.BUSY_TIMEOUT)
+    rng = random.Random(7)
+    # Ticks continue after the synthetic history so each insert is a new row
+    first_tick = int(time.time()) // 60 * 60 + 60
+    attempted = failed = 0
+    slowest_ms = 0.0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            status_db.insert_cycle(conn, first_tick + attempted * 60, synthetic_row(rng, False), {}, [], {})
+        except sqlite3.OperationalError as e:
+            print(f"insert failed: {e}", file=sys.stderr)
+            failed += 1
+        attempted += 1
+        slowest_ms = max(slowest_ms, (time.perf_counter() - started) * 1000)
+        time.sleep(interval)
+    conn.close()
+    results.put((first_tick, attempted, failed, slowest_ms))
+
+
+def _stress_reader(db_path, stop, stats):
+    conn = status_db.open_db_readonly(db_path)
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            app.query_series(conn, *app.get_range_bounds(conn, 'all_time'))
+            stats['queries'] += 1
+        except (pd.errors.DatabaseError, sqlite3.OperationalError) as e:
+            print(f"read failed: {e}", file=sys.stderr)
+            stats['errors'] += 1
+        stats['slowest_ms'] = max(stats['slowest_ms'], (time.perf_counter() - started) * 1000)
+    conn.close()
+
+
+# Function to run concurrent dashboard readers against a fast checker writer
+def bench_wal_stress(db_path, seconds, readers, interval, journal_mode):
+    """
+    A writer process inserts a cycle every `interval` seconds (instead of
+    every minute) while `readers` threads keep running the dashboard's
+    All Time query. Reports failed and lost inserts and the slowest insert
+    and read.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.close()
+
+    results = multiprocessing.Queue()
+    writer = multiprocessing.Process(target=_stress_writer, args=(db_path, seconds, interval, results))
+    stop = threading.Event()
+    stats = [{'queries': 0, 'errors': 0, 'slowest_ms': 0.0} for _ in range(readers)]
+    threads = [threading.Thread(target=_stress_reader, args=(db_path, stop, s)) for s in stats]
+    writer.start()
+    for thread in threads:
+        thread.start()
+    first_tick, attempted, failed, slowest_insert_ms = results.get()
+    writer.join()
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    conn = status_db.open_db_readonly(db_path)
+    stored = conn.execute("SELECT COUNT(*) FROM internet_status WHERE ts_ms >= ?", (first_tick * 1000,)).fetchone()[0]
+    conn.close()
+    print(f"journal mode: {journal_mode}, {readers} readers, {seconds} s")
+    print(f"inserts attempted {attempted}, failed {failed}, lost {attempted - stored}, "
+          f"slowest insert {slowest_insert_ms:.1f} ms")
+    print(f"reads {sum(s['queries'] for s in stats)}, failed {sum(s['errors'] for s in stats)}, "
+          f"slowest read {max(s['slowest_ms'] for s in stats):.1f} ms")
+
+
+# Function to make up a cached dataset of `rows` one-minute points
+def synthetic_dataset(rows):
+    rng = np.random.default_rng(42)
+    end_ms = int(time.time()) // 60 * 60000
+    ts_ms = np.arange(end_ms - rows * 60000, end_ms, 60000, dtype='int64')
+    df = pd.DataFrame({'timestamp': pd.to_datetime(ts_ms, unit='ms'), 'ts_ms': ts_ms})
+    df['success'] = np.where(rng.random(rows) < 0.001, 0, 100)
+    df['packet_loss'] = 100.0 - df['success']
+    for column in app.LATENCY_COLUMNS:
+        df[column] = rng.lognormal(3, 0.3, rows)
+    df['full_up_count'] = (df['success'] == 100).astype(int)
+    df['partial_up_count'] = 0
+    df['down_count'] = (df['success'] == 0).astype(int)
+    return df[app.DATASET_COLUMNS]
+
+
+# Function to compare cache value formats for the dataset
+def bench_cache_format():
+    """
+    Compares the old cached value (pickled list of row dicts, rebuilt into a
+    DataFrame on a hit) with the packed columnar frame. Bytes are what the
+    Redis client would store; Redis itself is not involved.
+    """
+    formats = {
+        'records': (lambda df: pickle.dumps(df.to_dict('records'), pickle.HIGHEST_PROTOCOL),
+                    lambda blob: pd.DataFrame(pickle.loads(blob))),
+        'packed': (lambda df: pickle.dumps({'frame': pack_frame(df)}, pickle.HIGHEST_PROTOCOL),
+                   lambda blob: unpack_frame(pickle.loads(blob)['frame'])),
+    }
+    print(f"{'rows':>8}  {'format':<10}{'bytes stored':>14}{'store ms':>10}{'hit ms':>10}")
+    for rows in (20000, 200000):
+        df = synthetic_dataset(rows)
+        for name, (store, load) in formats.items():
+            blob, store_ms = _time(store, df)
+            hit, hit_ms = _time(load, blob)
+            assert len(hit) == rows
+            print(f"{rows:>8}  {name:<10}{len(blob):>14}{store_ms:>10.1f}{hit_ms:>10.1f}")
+
+
+# Function to check and time per-trace downsampling
+def bench_downsample():
+    """
+    Downsamples every graph trace of a one-minute dataset to
+    TRACE_POINT_BUDGET points and checks that no zero-success minute (and no
+    latency gap) is dropped. Fails with an AssertionError if one is.
+    """
+    print(f"{'rows':>8}  {'trace':<20}{'points':>8}{'outages':>9}{'ms':>8}")
+    for rows in (1440, 20000, 200000):
+        df = synthetic_dataset(rows)
+        # Outage minutes have no latency, as in the real data
+        down = df['success'] == 0
+        df.loc[down, app.LATENCY_COLUMNS] = np.nan
+        outages = set(df.loc[down, 'timestamp'])
+        for column in ['success', 'packet_loss', 'avg_latency_ms']:
+            (x, y), ms = _time(app.trace_points, df, column)
+            missing = outages - set(x)
+            assert not missing, f"{column}: {len(missing)} outage minute(s) dropped"
+            assert len(x) <= max(app.TRACE_POINT_BUDGET, 3) + len(outages)
+            if column == 'success':
+                assert (y[x.isin(outages)] == 0).all()
+            print(f"{rows:>8}  {column:<20}{len(x):>8}{len(outages):>9}{ms:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard data layer benchmarks.")
+    parser.add_argument('benchmark', choices=['rows-read', 'wal-stress', 'cache-format', 'downsample'])
+    parser.add_argument('--days', type=int, default=14, help="Days of one-minute rows in the synthetic database")
+    parser.add_argument('--seconds', type=int, default=30, help="wal-stress: how long the writer runs")
+    parser.add_argument('--readers', type=int, default=4, help="wal-stress: concurrent dashboard readers")
+    parser.add_argument('--interval', type=float, default=0.05, help="wal-stress: seconds between inserts")
+    parser.add_argument('--journal-mode', choices=['wal', 'delete'], default='wal',
+                        help="wal-stress: journal mode to test ('delete' is the old behaviour)")
+    args = parser.parse_args()
+
+    if args.benchmark == 'cache-format':
+        bench_cache_format()
+        return
+    if args.benchmark == 'downsample':
+        bench_downsample()
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'internet_status.db')
+        print(f"Building synthetic database ({args.days} days of one-minute rows)...", file=sys.stderr)
+        make_synthetic_db(db_path, args.days)
+        if args.benchmark == 'rows-read':
+            bench_rows_read(db_path)
+        elif args.benchmark == 'wal-stress':
+            bench_wal_stress(db_path, args.seconds, args.readers, args.interval, args.journal_mode)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+# Function to pick the indices Largest-Triangle-Three-Buckets keeps
+def lttb_indices(x, y, threshold):
+    """
+    Returns the sorted indices of at most `threshold` points that keep the
+    visual shape of the line (x, y): the first and last points plus, for each
+    of the threshold - 2 equal buckets in between, the point forming the
+    largest triangle with the previously kept point and the next bucket's
+    mean. NaN points are never picked.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    filled = np.where(np.isnan(y), np.nanmean(y) if not np.isnan(y).all() else 0.0, y)
+
+    # Bucket edges over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    # Mean of every bucket at once, for use as the third triangle corner
+    sums_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sums_y = np.add.reduceat(filled[:n - 1], edges[:-1])
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, filled[-1])
+
+    kept = np.empty(threshold, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+    # Each bucket depends on the point kept in the previous one, so this loop
+    # is per bucket; the triangle areas within a bucket are computed at once
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - mean_x[bucket + 1]) * (by - filled[a])
+                      - (x[a] - bx) * (mean_y[bucket + 1] - filled[a]))
+        area = np.nan_to_num(area, nan=-1.0)
+        a = start + int(np.argmax(area))
+        kept[bucket + 1] = a
+    return kept
+
+
+# Function to downsample one trace while keeping flagged points
+def downsample_trace(x, y, budget, keep=None):
+    """
+    Returns the indices to plot for the trace (x, y): LTTB down to `budget`
+    points, plus every point where `keep` is True (outages, gaps), which are
+    always plotted even if that means going over the budget. Traces already
+    within the budget are returned whole.
+    """
+    n = len(x)
+    if n <= budget:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool) if keep is None else np.asarray(keep, dtype=bool)
+    kept = lttb_indices(x, y, max(budget - int(keep.sum()), 3))
+    return np.union1d(kept, np.flatnonzero(keep))
@@ -0,0 +1,61 @@
+import json
+import struct
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'DFC1'
+PREFIX = struct.Struct('<4sI')  # magic, header length
+ALIGNMENT = 8  # Column buffers start on 8-byte boundaries so they can be viewed in place
+
+
+# Function to pack a DataFrame into a columnar binary blob
+def pack_frame(df):
+    """
+    Serializes a DataFrame of numeric and datetime columns as a small JSON
+    header (row count, column names and dtypes) followed by each column's
+    raw array bytes. Object columns (e.g. all-None) are stored as float64.
+    """
+    columns = []
+    buffers = []
+    offset = 0
+    for name in df.columns:
+        values = df[name]
+        if values.dtype == object:
+            values = pd.to_numeric(values, errors='raise').astype('float64')
+        array = np.ascontiguousarray(values.to_numpy())
+        if array.dtype.kind == 'M':
+            dtype = str(array.dtype)
+            array = array.view('int64')
+        else:
+            dtype = array.dtype.str
+        columns.append([name, dtype, offset])
+        padding = -array.nbytes % ALIGNMENT
+        buffers.append(array.tobytes() + b'\0' * padding)
+        offset += array.nbytes + padding
+
+    header = json.dumps({'rows': len(df), 'columns': columns}).encode()
+    header += b' ' * (-(PREFIX.size + len(header)) % ALIGNMENT)
+    return PREFIX.pack(MAGIC, len(header)) + header + b''.join(buffers)
+
+
+# Function to rebuild a DataFrame from pack_frame's blob
+def unpack_frame(blob):
+    """
+    Returns the DataFrame. Each column is a read-only view into `blob`
+    (np.frombuffer), so nothing is parsed or copied per row.
+    """
+    magic, header_length = PREFIX.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a packed frame")
+    header = json.loads(blob[PREFIX.size:PREFIX.size + header_length])
+    data_start = PREFIX.size + header_length
+    rows = header['rows']
+    data = {}
+    for name, dtype, offset in header['columns']:
+        if dtype.startswith('datetime64'):
+            array = np.frombuffer(blob, 'int64', rows, data_start + offset).view(dtype)
+        else:
+            array = np.frombuffer(blob, dtype, rows, data_start + offset)
+        data[name] = array
+    return pd.DataFrame(data, copy=False)
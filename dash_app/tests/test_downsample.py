@@ -0,0 +1,54 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from downsample import downsample_trace, lttb_indices  # noqa: E402
+
+
+# Function to make up `rows` one-minute cycles with an outage every `outage_every` minutes
+def minute_series(rows, outage_every=997):
+    rng = np.random.default_rng(42)
+    x = np.arange(rows, dtype='int64') * 60000
+    success = np.full(rows, 100.0)
+    success[::outage_every] = 0
+    # A few outages right next to each other, and one at the very end
+    success[rows // 2:rows // 2 + 3] = 0
+    success[-1] = 0
+    latency = rng.lognormal(3, 0.3, rows)
+    latency[success == 0] = np.nan
+    return x, success, latency
+
+
+@pytest.mark.parametrize('rows', [1440, 20000, 200000])
+def test_no_zero_success_minute_is_dropped(rows):
+    x, success, latency = minute_series(rows)
+    outages = success == 0
+    for y in (success, latency):
+        # Same flags as app.trace_points: cycles with a down count, and gaps
+        kept = downsample_trace(x, y, 1000, keep=outages | np.isnan(y))
+        assert set(np.flatnonzero(outages)) <= set(kept)
+        assert np.all(np.diff(kept) > 0)
+
+
+def test_budget_is_kept_apart_from_flagged_points():
+    x, success, _ = minute_series(20000)
+    outages = success == 0
+    kept = downsample_trace(x, success, 1000, keep=outages)
+    assert len(kept) <= 1000
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+
+
+def test_short_traces_are_returned_whole():
+    x, success, _ = minute_series(500)
+    assert list(downsample_trace(x, success, 1000)) == list(range(500))
+
+
+def test_lttb_keeps_a_single_dip_without_flags():
+    x = np.arange(10000, dtype='float64')
+    y = np.full(10000, 100.0)
+    y[4321] = 0
+    assert 4321 in lttb_indices(x, y, 500)
+
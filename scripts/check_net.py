@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+
+import status_db
+from cycle_scheduler import (LATE_TICK_THRESHOLD, RUN_ONCE_LATE_TICK_THRESHOLD, CycleLock, current_tick,
+                             missed_ticks, next_tick)
+from icmp_sampler import open_sampler
+from live_push import CyclePublisher
+from probe_engine import PING_COUNT_PER_TARGET, PING_TIMEOUT, TARGETS, fail_fast_deadline, run_probes, summarize
+
+# Get the directory where the script is located
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+
+DB_FILE = os.path.join(SCRIPT_DIR, 'logs', 'internet_status.db')
+RETENTION_DAYS = 14  # Set db retention period in days (default is 14 days)
+
+FAILURE_COUNT_FILE = os.path.join(SCRIPT_DIR, 'logs', 'failure_count.txt')
+LOG_FILE = os.path.join(SCRIPT_DIR, 'logs', 'check_internet.log')
+LOCK_FILE = os.path.join(SCRIPT_DIR, 'logs', 'check_net.lock')
+LIVE_PUSH_DOWN_FILE = os.path.join(SCRIPT_DIR, 'logs', 'live_push_down')  # Exists while Redis announcements fail
+POWER_CYCLE_SCRIPT = os.path.join(SCRIPT_DIR, 'power_cycle_p100.py')
+# Interpreter for the power cycle script, which needs pytapo: POWER_CYCLE_PYTHON if
+# set, else the virtual environment's next to the scripts, else the checker's own
+VENV_PYTHON = os.path.join(SCRIPT_DIR, '..', 'venv', 'bin', 'python3')
+POWER_CYCLE_PYTHON = os.environ.get('POWER_CYCLE_PYTHON') or (
+    VENV_PYTHON if os.path.exists(VENV_PYTHON) else sys.executable)
+
+FAILURE_THRESHOLD = 5  # Consecutive failed cycles before the modem is power cycled
+CYCLE_INTERVAL = 60  # Seconds between cycles; daemon cycles start on multiples of this (minute boundaries)
+# Seconds between cycles in daemon mode while the internet is down. Only the first of
+# these in each CYCLE_INTERVAL is stored, so there is still one row per minute
+OUTAGE_CYCLE_INTERVAL = 15
+
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class InternetChecker:
+    """
+    Holds the database connection, target list, failure counter and ICMP
+    socket for the lifetime of the process, so daemon mode only pays the
+    setup cost once. Cycles only run while holding the cycle lock.
+    """
+
+    def __init__(self, db_file=DB_FILE, targets=TARGETS, late_threshold=LATE_TICK_THRESHOLD):
+        self.conn = status_db.open_db(db_file)
+        self.targets = list(targets)
+        self.late_threshold = late_threshold  # Seconds of start lag before a tick is recorded as late
+        self.target_ids = status_db.target_ids(self.conn, self.targets)
+        self.lock = CycleLock(LOCK_FILE)
+        self.failure_count = None  # Loaded under the cycle lock on the first tick
+        self.in_outage = False  # True while the last cycle saw 0% success
+        self.median_rtt_ms = status_db.latest_median_rtt(self.conn)  # Sets the fail-fast deadline
+        self.sampler = open_sampler()
+        if self.sampler is None:
+            logging.warning("ICMP sockets not permitted, falling back to the ping binary")
+        self.publisher = CyclePublisher(state_file=LIVE_PUSH_DOWN_FILE)
+
+    def close(self):
+        if self.sampler is not None:
+            self.sampler.close()
+        self.publisher.close()
+        self.conn.close()
+
+    def _read_failure_count(self):
+        try:
+            with open(FAILURE_COUNT_FILE) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            # Fresh install: create the file so the counter can be inspected from the first cycle
+            self._write_failure_count(0)
+            return 0
+        except (OSError, ValueError):
+            return 0
+
+    def _write_failure_count(self, count):
+        with open(FAILURE_COUNT_FILE, "w") as f:
+            f.write(f"{count}\n")
+
+    def _set_failure_count(self, count):
+        # Only touch the file when the count changes; it lets run-once mode pick up where it left off
+        if count != self.failure_count:
+            self.failure_count = count
+            self._write_failure_count(count)
+
+    async def run_tick(self, scheduled_at, store=True):
+        """
+        Runs the cycle for the tick scheduled at `scheduled_at` (epoch seconds)
+        unless another cycle is still in flight, and records the tick's outcome.
+        With store=False (outage-mode checks between minutes) the cycle only
+        counts towards the power cycle threshold and stores no row.
+        """
+        started_at = time.time()
+        lag_ms = int((started_at - scheduled_at) * 1000)
+        tick = status_db.format_timestamp(scheduled_at)
+
+        if not self.lock.acquire():
+            logging.warning(f"Previous check cycle still running, skipping tick {tick}")
+            status_db.insert_tick(self.conn, tick, 'skipped', lag_ms)
+            return None
+
+        try:
+            if self.failure_count is None:
+                self.failure_count = self._read_failure_count()
+                self.in_outage = self.failure_count > 0
+            row = await self.run_cycle(scheduled_at, store)
+        finally:
+            self.lock.release()
+
+        duration_ms = int((time.time() - started_at) * 1000)
+        outcome = 'late' if lag_ms > self.late_threshold * 1000 else 'ran'
+        if outcome == 'late':
+            logging.warning(f"Check cycle for tick {tick} started {lag_ms} ms late")
+        status_db.insert_tick(self.conn, tick, outcome, lag_ms, duration_ms)
+        return row
+
+    async def run_cycle(self, scheduled_at, store=True):
+        """
+        Probes all targets, records the result under the tick it was scheduled
+        for (epoch seconds) unless `store` is False, and handles consecutive failures.
+        """
+
+        samples, short_circuited = await run_probes(self.targets, PING_COUNT_PER_TARGET, PING_TIMEOUT,
+                                                    sampler=self.sampler,
+                                                    fail_fast_deadline=fail_fast_deadline(self.median_rtt_ms))
+        if short_circuited:
+            logging.warning("All targets unreachable, internet check cut short")
+        logging.info("finished running internet check")
+
+        row = summarize(samples)
+        target_rows = {target: summarize([s for s in samples if s.target == target]) for target in self.targets}
+        logging.info(f"Latencies calculated - AVG: {row['avg_latency_ms']}, "
+                     f"MAX: {row['max_latency_ms']}, MIN: {row['min_latency_ms']}")
+        if row['p50_latency_ms'] is not None:
+            self.median_rtt_ms = row['p50_latency_ms']
+
+        if not store:
+            logging.info("Outage-mode check between minutes, not stored")
+            await self.handle_failures(row['success_percentage'])
+            return row
+
+        try:
+            status_db.insert_cycle(self.conn, scheduled_at, row, target_rows, samples, self.target_ids)
+            logging.info("Log successfully inserted into db")
+            # Open dashboards pick the new row up right away instead of on their next poll
+            self.publisher.publish(status_db.data_version(self.conn))
+        except Exception as e:
+            logging.error(f"Failed to insert log into db: {e}")
+
+        try:
+            dropped = status_db.cleanup_old_rows(self.conn, RETENTION_DAYS)
+            if dropped:
+                logging.info(f"Dropped {dropped} expired day partition(s) (kept last {RETENTION_DAYS} days)")
+        except Exception as e:
+            logging.error(f"Failed to clean up old data: {e}")
+
+        await self.handle_failures(row['success_percentage'])
+        return row
+
+    async def handle_failures(self, success_percentage):
+        self.in_outage = success_percentage == 0
+        if success_percentage > 0:
+            # Reset failure count if internet is back up
+            self._set_failure_count(0)
+            return
+
+        self._set_failure_count(self.failure_count + 1)
+        if self.failure_count >= FAILURE_THRESHOLD:
+            logging.warning(f"Internet down for {FAILURE_THRESHOLD}+ checks. Power cycling modem...")
+            await self.power_cycle()
+            # Reset failure count after power cycle
+            self._set_failure_count(0)
+
+    async def power_cycle(self):
+        with open(LOG_FILE, "a") as log:
+            proc = await asyncio.create_subprocess_exec(POWER_CYCLE_PYTHON, POWER_CYCLE_SCRIPT, stdout=log, stderr=log)
+            returncode = await proc.wait()
+        if returncode == 0:
+            logging.info("Power cycle script completed")
+        else:
+            logging.error(f"Power cycle script failed with exit code {returncode}")
+
+    async def run_forever(self, interval=CYCLE_INTERVAL, outage_interval=OUTAGE_CYCLE_INTERVAL):
+        """
+        Runs a cycle on every wall-clock multiple of `interval` seconds (minute
+        boundaries by default) until SIGTERM or SIGINT is received, so rows are
+        evenly spaced. While the internet is down cycles run every
+        `outage_interval` seconds instead, so the power cycle threshold is
+        reached within minutes; only the first of those in each `interval`
+        stores a row, so the dashboard's per-minute counts hold. Ticks that pass while a cycle overruns are
+        recorded as skipped rather than run late in a burst.
+        """
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+
+        scheduled_at = next_tick(time.time(), interval)
+        while not stop.is_set():
+            try:
+                # The delay is measured on the wall clock but slept on the loop's monotonic clock
+                await asyncio.wait_for(stop.wait(), max(0, scheduled_at - time.time()))
+                break
+            except asyncio.TimeoutError:
+                pass
+
+            was_in_outage = self.in_outage
+            # Rows stay one per `interval`: in outage mode only the first tick of each is stored
+            store = scheduled_at % interval < (outage_interval if self.in_outage else interval)
+            try:
+                await self.run_tick(scheduled_at, store)
+            except Exception as e:
+                logging.error(f"Check cycle failed: {e}")
+
+            if self.in_outage != was_in_outage:
+                logging.info("Entering outage mode" if self.in_outage else "Leaving outage mode")
+            period = outage_interval if self.in_outage else interval
+
+            now = time.time()
+            for tick in missed_ticks(scheduled_at, now, period):
+                logging.warning(f"Check cycle overran, skipping tick {status_db.format_timestamp(tick)}")
+                status_db.insert_tick(self.conn, status_db.format_timestamp(tick), 'skipped',
+                                      int((now - tick) * 1000))
+            scheduled_at = next_tick(now, period)
+        logging.info("Stopping internet check daemon")
+
+
+async def run(daemon, interval, outage_interval, targets):
+    checker = InternetChecker(targets=targets,
+                              late_threshold=LATE_TICK_THRESHOLD if daemon else RUN_ONCE_LATE_TICK_THRESHOLD)
+    try:
+        if daemon:
+            logging.info(f"Starting internet check daemon (every {interval} seconds)")
+            await checker.run_forever(interval, outage_interval)
+        else:
+            # The timer fires on the minute, so the run belongs to the boundary it started after
+            await checker.run_tick(current_tick(time.time(), interval))
+    finally:
+        checker.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check internet connectivity and power cycle the modem on outages.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--once', action='store_true', help="Run a single check cycle and exit (default)")
+    mode.add_argument('--daemon', action='store_true', help="Stay resident and run a cycle every interval")
+    parser.add_argument('--interval', type=float, default=CYCLE_INTERVAL, help="Seconds between cycles in daemon mode")
+    parser.add_argument('--outage-interval', type=float, default=OUTAGE_CYCLE_INTERVAL,
+                        help="Seconds between cycles in daemon mode while the internet is down")
+    parser.add_argument('--targets', nargs='+', default=TARGETS, help="Target IPs to probe")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.daemon, args.interval, args.outage_interval, args.targets))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import fcntl
+import math
+import os
+
+LATE_TICK_THRESHOLD = 5  # Seconds after its scheduled time before a daemon cycle start counts as late
+# The same for run-once mode, where each start also pays for the timer's accuracy
+# window, process startup and imports
+RUN_ONCE_LATE_TICK_THRESHOLD = 20
+
+
+class CycleLock:
+    """
+    Exclusive flock on a lock file, held while a check cycle is in flight so
+    overlapping runs (timer and daemon, or two slow timer runs) never race.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def acquire(self):
+        """
+        Takes the lock without blocking. Returns False if another process holds it.
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self.fd = fd
+        return True
+
+    def release(self):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+
+# Function to find the tick a run belongs to (the last wall-clock boundary at or before `now`)
+def current_tick(now, interval):
+    return math.floor(now / interval) * interval
+
+
+# Function to find the first wall-clock boundary strictly after `now`
+def next_tick(now, interval):
+    return current_tick(now, interval) + interval
+
+
+# Function to list the ticks that passed while a cycle was running
+def missed_ticks(scheduled_at, now, interval):
+    """
+    Returns the boundaries after `scheduled_at` and up to `now` whose cycles
+    could not start because the previous cycle was still running.
+    """
+    missed = []
+    tick = next_tick(scheduled_at, interval)
+    while tick <= now:
+        missed.append(tick)
+        tick += interval
+    return missed
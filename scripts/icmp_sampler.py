@@ -0,0 +1,147 @@
+import asyncio
+import itertools
+import os
+import socket
+import struct
+import time
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+PAYLOAD = bytes(range(56))  # Same payload size as the default `ping`
+
+# Function to compute the RFC 1071 internet checksum
+def checksum(data):
+    """
+    Returns the 16-bit one's complement checksum of the data.
+    """
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+class IcmpSampler:
+    """
+    Sends ICMP echo requests and matches replies from a single socket, without
+    forking `ping`. Uses an unprivileged datagram ICMP socket when
+    net.ipv4.ping_group_range allows it, otherwise falls back to a raw socket.
+    """
+
+    def __init__(self):
+        self.sock = None
+        self.raw = False
+        self.ident = os.getpid() & 0xffff
+        self._sequence = itertools.count()
+        self._pending = {}  # (address, sequence) -> (future, sent monotonic ns)
+        self._addresses = {}  # target -> resolved IPv4 address
+        self._loop = None
+
+    def open(self):
+        """
+        Opens the ICMP socket, raising PermissionError if neither socket type is allowed.
+        """
+        try:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            self.raw = False
+        except PermissionError:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self.raw = True
+        self.sock.setblocking(False)
+        return self
+
+    def close(self):
+        if self._loop is not None:
+            if not self._loop.is_closed():
+                self._loop.remove_reader(self.sock.fileno())
+            self._loop = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        for future, _ in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+    @property
+    def mode(self):
+        return 'raw' if self.raw else 'datagram'
+
+    def _attach(self):
+        # Register the reader with whichever event loop is running this probe
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self.sock.fileno())
+            loop.add_reader(self.sock.fileno(), self._on_readable)
+            self._loop = loop
+
+    def _resolve(self, target):
+        address = self._addresses.get(target)
+        if address is None:
+            address = socket.gethostbyname(target)
+            self._addresses[target] = address
+        return address
+
+    def _on_readable(self):
+        while True:
+            try:
+                packet, (address, _) = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            received_ns = time.monotonic_ns()
+
+            if self.raw:
+                # Raw sockets deliver the IP header too, and see every ICMP packet on the host
+                packet = packet[(packet[0] & 0x0f) * 4:]
+            if len(packet) < 8:
+                continue
+            icmp_type, _, _, ident, sequence = struct.unpack('!BBHHH', packet[:8])
+            if icmp_type != ICMP_ECHO_REPLY:
+                continue
+            # The kernel rewrites the identifier on datagram sockets and only
+            # delivers our own replies, so it is only checked on raw sockets
+            if self.raw and ident != self.ident:
+                continue
+
+            entry = self._pending.pop((address, sequence), None)
+            if entry is None:
+                continue
+            future, sent_ns = entry
+            if not future.done():
+                future.set_result((received_ns - sent_ns) / 1e6)
+
+    async def ping(self, target, timeout):
+        """
+        Sends one echo request and returns the round-trip time in ms, or None on loss.
+        """
+        self._attach()
+        address = self._resolve(target)
+        sequence = next(self._sequence) & 0xffff
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, self.ident, sequence)
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum(header + PAYLOAD), self.ident, sequence)
+
+        future = self._loop.create_future()
+        key = (address, sequence)
+        self._pending[key] = (future, time.monotonic_ns())
+        try:
+            self.sock.sendto(header + PAYLOAD, (address, 0))
+            return await asyncio.wait_for(future, timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            self._pending.pop(key, None)
+
+
+# Function to open a sampler, returning None when ICMP sockets are not permitted
+def open_sampler():
+    """
+    Returns an open IcmpSampler, or None if this process may not open ICMP sockets.
+    """
+    try:
+        return IcmpSampler().open()
+    except PermissionError:
+        return None
+
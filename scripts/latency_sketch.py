@@ -0,0 +1,141 @@
+import math
+import struct
+
+RELATIVE_ACCURACY = 0.01  # Quantiles are within 1% of the true value
+MIN_INDEXED_MS = 1e-3  # Values below this (1 us) are counted in the zero bucket
+
+SKETCH_VERSION = 1
+HEADER = struct.Struct('<BdIddd')  # version, relative accuracy, zero count, min, max, sum
+
+
+class LatencySketch:
+    """
+    Mergeable quantile sketch of RTTs (DDSketch with logarithmic buckets).
+    Any quantile read back is within RELATIVE_ACCURACY of a real sample, and
+    sketches from different cycles merge exactly, so percentiles over hours
+    or days can be computed from the per-cycle sketches alone.
+    """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}  # bucket index -> count
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+
+    def add(self, value_ms):
+        if value_ms < MIN_INDEXED_MS:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value_ms) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+        self.sum += value_ms
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        return self
+
+    def quantile(self, q):
+        """
+        Returns the q-quantile (0 <= q <= 1), or None for an empty sketch.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return self.min
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_bytes(self):
+        """
+        Serializes the sketch: a fixed header followed by the bucket count and
+        varint-encoded (index delta, count) pairs.
+        """
+        out = bytearray(HEADER.pack(SKETCH_VERSION, self.relative_accuracy, self.zero_count,
+                                    self.min, self.max, self.sum))
+        _write_varint(out, len(self.bins))
+        previous = 0
+        for index in sorted(self.bins):
+            _write_varint(out, _zigzag(index - previous))
+            _write_varint(out, self.bins[index])
+            previous = index
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        version, relative_accuracy, zero_count, minimum, maximum, total = HEADER.unpack_from(data)
+        if version != SKETCH_VERSION:
+            raise ValueError(f"Unsupported sketch version {version}")
+        sketch = cls(relative_accuracy)
+        sketch.zero_count = zero_count
+        sketch.min, sketch.max, sketch.sum = minimum, maximum, total
+
+        position = HEADER.size
+        n_bins, position = _read_varint(data, position)
+        index = 0
+        for _ in range(n_bins):
+            delta, position = _read_varint(data, position)
+            count, position = _read_varint(data, position)
+            index += _unzigzag(delta)
+            sketch.bins[index] = count
+        sketch.count = zero_count + sum(sketch.bins.values())
+        return sketch
+
+
+# Function to merge serialized sketches, skipping empty values
+def merge_sketches(blobs):
+    """
+    Merges an iterable of serialized sketches into one LatencySketch.
+    """
+    merged = LatencySketch()
+    for blob in blobs:
+        if blob:
+            merged.merge(LatencySketch.from_bytes(blob))
+    return merged
+
+
+def _zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, position):
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
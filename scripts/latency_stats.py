@@ -0,0 +1,63 @@
+import bisect
+import math
+
+
+class LatencyStats:
+    """
+    Summarizes RTT samples in a single pass: count, min/max, mean and
+    standard deviation (Welford), p50/p95/p99 (nearest rank over a sorted
+    list kept with insort) and RFC 3550 interarrival jitter.
+
+    Jitter only makes sense between consecutive replies from the same
+    target, so samples are tagged with a stream and jitter is tracked per
+    stream; `jitter` reports the mean over all streams.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._sorted = []
+        self._last = {}  # stream -> previous sample
+        self._jitter = {}  # stream -> running jitter estimate
+
+    def add(self, rtt_ms, stream=None):
+        self.count += 1
+        delta = rtt_ms - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (rtt_ms - self._mean)
+        self.min = rtt_ms if self.min is None else min(self.min, rtt_ms)
+        self.max = rtt_ms if self.max is None else max(self.max, rtt_ms)
+        bisect.insort(self._sorted, rtt_ms)
+
+        # RFC 3550 section 6.4.1: J += (|D| - J) / 16
+        last = self._last.get(stream)
+        if last is not None:
+            jitter = self._jitter.get(stream, 0.0)
+            self._jitter[stream] = jitter + (abs(rtt_ms - last) - jitter) / 16
+        self._last[stream] = rtt_ms
+
+    @property
+    def mean(self):
+        return self._mean if self.count else None
+
+    @property
+    def stddev(self):
+        return math.sqrt(self._m2 / self.count) if self.count else None
+
+    @property
+    def jitter(self):
+        if not self._jitter:
+            return None
+        return sum(self._jitter.values()) / len(self._jitter)
+
+    def percentile(self, p):
+        """
+        Returns the nearest-rank p-th percentile (0 < p <= 100), or None without samples.
+        """
+        if not self.count:
+            return None
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        return self._sorted[rank - 1]
@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # Live push is optional; dashboards keep polling without it
+    redis = None
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+CHANNEL = 'internet_status:cycles'  # Redis pub/sub channel each stored cycle is announced on
+CONNECT_TIMEOUT = 1  # Seconds to wait for the Redis server to accept a connection
+PUBLISH_TIMEOUT = 0.25  # Seconds a cycle waits on Redis before giving up on its announcement
+RECONNECT_DELAY = 5  # Seconds before the first attempt to resubscribe after an error
+RECONNECT_MAX_DELAY = 300  # Cap on the delay, which doubles with each failed attempt
+LISTENER_BACKLOG = 16  # Announcements kept for a listener that isn't reading
+
+
+class CyclePublisher:
+    """
+    Used by the checker to announce each stored cycle on CHANNEL, so open
+    dashboards refresh within seconds instead of on their next poll. Without
+    the redis package or a reachable server, announcements are skipped and
+    the checker carries on as before.
+
+    A warning is logged once per outage. In run-once mode each cycle is a new
+    process, so pass `state_file` to remember an ongoing outage between runs
+    (the file exists while Redis is failing).
+    """
+
+    def __init__(self, url=REDIS_URL, state_file=None):
+        self.client = None
+        if redis is not None:
+            self.client = redis.Redis.from_url(url, socket_timeout=PUBLISH_TIMEOUT,
+                                               socket_connect_timeout=PUBLISH_TIMEOUT)
+        self.state_file = state_file
+        self._failing = state_file is not None and os.path.exists(state_file)
+
+    def publish(self, version):
+        """
+        Announces the database's new data version (see status_db.data_version).
+        Returns the number of subscribers that received it.
+        """
+        if self.client is None:
+            return 0
+        try:
+            receivers = self.client.publish(CHANNEL, json.dumps({'version': version}))
+        except redis.RedisError as e:
+            # Warn once per outage rather than every minute
+            if not self._failing:
+                logging.warning(f"Could not announce new cycle to dashboards: {e}")
+                self._set_failing(True)
+            return 0
+        if self._failing:
+            logging.info("Announcing new cycles to dashboards again")
+            self._set_failing(False)
+        return receivers
+
+    def _set_failing(self, failing):
+        self._failing = failing
+        if self.state_file is None:
+            return
+        try:
+            if failing:
+                open(self.state_file, 'w').close()
+            else:
+                os.remove(self.state_file)
+        except OSError:
+            pass  # At worst the next run warns again
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+
+
+class CycleFeed:
+    """
+    Used by the dashboard to relay CHANNEL to any number of listeners in this
+    process over one Redis subscription, so an open dashboard costs a queue
+    rather than a Redis connection. The subscriber thread starts with the
+    first listener and resubscribes after errors, backing off up to
+    RECONNECT_MAX_DELAY.
+    """
+
+    def __init__(self, url=REDIS_URL):
+        self.url = url
+        self._listeners = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._failing = False
+
+    @property
+    def available(self):
+        """
+        True if announcements can be relayed: the redis package is installed
+        and the server is reachable (as of the subscriber's last attempt, or a
+        ping before the subscriber has started).
+        """
+        if redis is None:
+            return False
+        with self._lock:
+            running = self._thread is not None
+        if running:
+            return not self._failing
+        client = redis.Redis.from_url(self.url, socket_timeout=CONNECT_TIMEOUT, socket_connect_timeout=CONNECT_TIMEOUT)
+        try:
+            return client.ping()
+        except redis.RedisError:
+            return False
+        finally:
+            client.close()
+
+    def listen(self):
+        """
+        Returns a queue that receives each announcement (a JSON string) from now on.
+        """
+        listener = queue.Queue(maxsize=LISTENER_BACKLOG)
+        with self._lock:
+            self._listeners.add(listener)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='cycle-feed', daemon=True)
+                self._thread.start()
+        return listener
+
+    def unlisten(self, listener):
+        with self._lock:
+            self._listeners.discard(listener)
+
+    def _run(self):
+        delay = RECONNECT_DELAY
+        try:
+            while True:
+                client = redis.Redis.from_url(self.url, socket_connect_timeout=CONNECT_TIMEOUT)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                try:
+                    pubsub.subscribe(CHANNEL)
+                    if self._failing:
+                        logging.info("Cycle feed resubscribed")
+                    self._failing = False
+                    delay = RECONNECT_DELAY
+                    for message in pubsub.listen():
+                        self._relay(message['data'])
+                except Exception as e:
+                    # Warn once per outage rather than on every retry
+                    if not self._failing:
+                        logging.warning(f"Cycle feed subscription failed ({e}), retrying with backoff")
+                    self._failing = True
+                finally:
+                    pubsub.close()
+                    client.close()
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        finally:
+            # Lets the next listen() start a new subscriber should this one ever exit
+            with self._lock:
+                self._thread = None
+
+    def _relay(self, data):
+        if isinstance(data, bytes):
+            data = data.decode()
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener.put_nowait(data)
+            except queue.Full:
+                pass  # Any one announcement is enough to make a stalled client refresh
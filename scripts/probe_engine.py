@@ -0,0 +1,249 @@
+import argparse
+import asyncio
+import re
+import time
+from collections import namedtuple
+
+from icmp_sampler import open_sampler
+from latency_sketch import LatencySketch
+from latency_stats import LatencyStats
+
+# Default probe settings (mirrors the original check_net.sh loop)
+TARGETS = ["8.8.8.8", "1.1.1.1", "9.9.9.9"]
+PING_COUNT_PER_TARGET = 33
+PING_TIMEOUT = 5  # Seconds to wait for each echo reply
+MAX_INFLIGHT_PER_TARGET = 33  # Upper bound on concurrent probes against a single target
+PROBE_SPACING = 0.05  # Seconds between probe launches against the same target
+FAIL_FAST_AFTER = 6  # Lost probes (with no replies at all) before a cycle is declared down
+FAIL_FAST_DEADLINE = 1.0  # Seconds without a reply from any target before a cycle is declared down
+FAIL_FAST_RTT_FACTOR = 10  # Typical round trips to wait instead, on links slow enough to need longer
+
+# Loopback addresses used by --loopback to exercise the engine without internet
+LOOPBACK_TARGETS = ["127.0.0.1", "127.0.0.2", "127.0.0.3"]
+
+PING_TIME_RE = re.compile(r'time=([0-9.]+)')
+
+# A single probe outcome: rtt_ms is None when the probe was lost
+Sample = namedtuple('Sample', ['target', 'sent_at', 'rtt_ms'])
+# The samples of one probe run, and whether it was cut short by fast-fail detection
+ProbeRun = namedtuple('ProbeRun', ['samples', 'short_circuited'])
+
+
+# Function to run a single ping and return the round-trip time in ms (None on loss)
+async def ping_once(target, timeout=PING_TIMEOUT):
+    """
+    Runs `ping -c 1` against the target and parses the reported time.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            'ping', '-c', '1', '-W', str(timeout), target,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    try:
+        stdout, _ = await proc.communicate()
+    except asyncio.CancelledError:
+        # Don't leave the ping process behind when a cycle is short-circuited
+        proc.kill()
+        await proc.wait()
+        raise
+    match = PING_TIME_RE.search(stdout.decode(errors='replace'))
+    return float(match.group(1)) if match else None
+
+
+class FailFast:
+    """
+    Trips once `threshold` probes have been lost across all targets without a
+    single reply, or when the detection deadline passes (see expire) without
+    one, so a dead link is detected without waiting out every probe.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.successes = 0
+        self.failures = 0
+        self.tripped = asyncio.Event()
+
+    def record(self, rtt_ms):
+        if rtt_ms is None:
+            self.failures += 1
+        else:
+            self.successes += 1
+        if self.threshold and not self.successes and self.failures >= self.threshold:
+            self.tripped.set()
+
+    def expire(self):
+        # Losses only show up once a probe times out, so a healthy link's
+        # replies are what is waited for instead
+        if not self.successes:
+            self.tripped.set()
+
+
+# Function to pick how long a cycle waits for its first reply
+def fail_fast_deadline(median_rtt_ms=None):
+    """
+    Returns FAIL_FAST_DEADLINE, or FAIL_FAST_RTT_FACTOR round trips of
+    `median_rtt_ms` (the link's typical latency) if that is longer.
+    """
+    if median_rtt_ms is None:
+        return FAIL_FAST_DEADLINE
+    return max(FAIL_FAST_DEADLINE, FAIL_FAST_RTT_FACTOR * median_rtt_ms / 1000)
+
+
+async def _probe(ping, target, delay, timeout, semaphore, tracker):
+    await asyncio.sleep(delay)
+    async with semaphore:
+        sent_at = time.time()
+        rtt_ms = await ping(target, timeout)
+    tracker.record(rtt_ms)
+    return Sample(target, sent_at, rtt_ms)
+
+
+# Function to probe all targets concurrently
+async def run_probes(targets=TARGETS, count=PING_COUNT_PER_TARGET, timeout=PING_TIMEOUT,
+                     max_inflight=MAX_INFLIGHT_PER_TARGET, spacing=PROBE_SPACING, sampler=None,
+                     fail_fast_after=FAIL_FAST_AFTER, fail_fast_deadline=FAIL_FAST_DEADLINE):
+    """
+    Fires `count` probes at every target at the same time, at most
+    `max_inflight` in flight per target and launched `spacing` seconds apart.
+    Probes go through the native ICMP sampler when one is given, otherwise
+    through the `ping` binary.
+
+    If no target has replied `fail_fast_deadline` seconds into the run, or
+    `fail_fast_after` probes are lost before any reply arrives, the
+    remaining probes are cancelled and counted as lost.
+
+    Returns a ProbeRun whose samples are grouped by target in send order.
+    """
+    ping = sampler.ping if sampler is not None else ping_once
+    tracker = FailFast(fail_fast_after)
+    started_at = time.time()
+
+    probes = []
+    for target in targets:
+        semaphore = asyncio.Semaphore(max_inflight)
+        for index in range(count):
+            task = asyncio.ensure_future(_probe(ping, target, index * spacing, timeout, semaphore, tracker))
+            probes.append((target, task))
+
+    all_done = asyncio.gather(*(task for _, task in probes), return_exceptions=True)
+    tripped = asyncio.ensure_future(tracker.tripped.wait())
+    deadline = None
+    if fail_fast_deadline:
+        deadline = asyncio.get_running_loop().call_later(fail_fast_deadline, tracker.expire)
+    await asyncio.wait([all_done, tripped], return_when=asyncio.FIRST_COMPLETED)
+    tripped.cancel()
+    if deadline is not None:
+        deadline.cancel()
+
+    short_circuited = not all_done.done()
+    if short_circuited:
+        for _, task in probes:
+            task.cancel()
+    await all_done
+
+    samples = []
+    for target, task in probes:
+        if task.cancelled() or task.exception() is not None:
+            samples.append(Sample(target, started_at, None))
+        else:
+            samples.append(task.result())
+    return ProbeRun(samples, short_circuited)
+
+
+# Function to collapse samples into the internet_status row
+def summarize(samples):
+    """
+    Produces the same success/avg/min/max/loss figures check_net.sh wrote to
+    the internet_status table, plus tail percentiles, standard deviation and
+    jitter, in a single pass over the samples. The row also carries a
+    serialized LatencySketch of the RTTs for long-range percentiles.
+    """
+    stats = LatencyStats()
+    sketch = LatencySketch()
+    for sample in samples:
+        if sample.rtt_ms is not None:
+            stats.add(sample.rtt_ms, stream=sample.target)
+            sketch.add(sample.rtt_ms)
+
+    total_count = len(samples)
+    success_count = stats.count
+    success_percentage = success_count * 100 // total_count if total_count else 0
+    packet_loss = (total_count - success_count) * 100 // total_count if total_count else 100
+
+    if success_percentage == 100:
+        status = "Internet is fully up (100% success)"
+    elif success_percentage > 0:
+        status = f"Internet is partially up ({success_percentage}% success)"
+    else:
+        status = "Internet is down (0% success)"
+
+    return {
+        'status': status,
+        'success_percentage': success_percentage,
+        'avg_latency_ms': stats.mean,
+        'max_latency_ms': stats.max,
+        'min_latency_ms': stats.min,
+        'p50_latency_ms': stats.percentile(50),
+        'p95_latency_ms': stats.percentile(95),
+        'p99_latency_ms': stats.percentile(99),
+        'stddev_latency_ms': stats.stddev,
+        'jitter_ms': stats.jitter,
+        'packet_loss': packet_loss,
+        'latency_sketch': sketch.to_bytes() if sketch.count else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe targets concurrently and report latencies.")
+    parser.add_argument('targets', nargs='*', default=TARGETS, help="Target IPs to probe")
+    parser.add_argument('--count', type=int, default=PING_COUNT_PER_TARGET, help="Probes per target")
+    parser.add_argument('--timeout', type=float, default=PING_TIMEOUT, help="Per-probe timeout in seconds")
+    parser.add_argument('--max-inflight', type=int, default=MAX_INFLIGHT_PER_TARGET,
+                        help="Maximum concurrent probes per target")
+    parser.add_argument('--spacing', type=float, default=PROBE_SPACING,
+                        help="Seconds between probe launches per target")
+    parser.add_argument('--fail-fast-after', type=int, default=FAIL_FAST_AFTER,
+                        help="Lost probes with no replies before the run is cut short (0 disables)")
+    parser.add_argument('--fail-fast-deadline', type=float, default=FAIL_FAST_DEADLINE,
+                        help="Seconds without any reply before the run is cut short (0 disables)")
+    parser.add_argument('--sampler', choices=['auto', 'icmp', 'ping'], default='auto',
+                        help="Use native ICMP sockets, the ping binary, or ICMP with ping fallback")
+    parser.add_argument('--loopback', action='store_true',
+                        help=f"Test mode: probe {', '.join(LOOPBACK_TARGETS)} (works without internet)")
+    parser.add_argument('--summary', action='store_true',
+                        help="Print the summarized row as KEY=VALUE lines instead of raw latencies")
+    args = parser.parse_args()
+
+    targets = LOOPBACK_TARGETS if args.loopback else args.targets
+
+    sampler = None
+    if args.sampler != 'ping':
+        sampler = open_sampler()
+        if sampler is None and args.sampler == 'icmp':
+            parser.exit(1, "ICMP sockets not permitted: run as root or widen net.ipv4.ping_group_range\n")
+
+    try:
+        samples, _ = asyncio.run(run_probes(targets, args.count, args.timeout, args.max_inflight,
+                                            args.spacing, sampler, args.fail_fast_after,
+                                            args.fail_fast_deadline))
+    finally:
+        if sampler is not None:
+            sampler.close()
+
+    if args.summary:
+        for key, value in summarize(samples).items():
+            if isinstance(value, bytes):
+                continue
+            print(f"{key}={'NULL' if value is None else value}")
+    else:
+        # One latency per line for every successful probe, for piping into other tools
+        for sample in samples:
+            if sample.rtt_ms is not None:
+                print(sample.rtt_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,597 @@
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from latency_sketch import merge_sketches
+
+# Bumped whenever a migration is added to migrate()
+SCHEMA_VERSION = 3
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+BUSY_TIMEOUT = 10  # Seconds a connection waits for a lock before failing with "database is locked"
+WAL_SIZE_LIMIT = 4 * 1024 * 1024  # Bytes the WAL file is truncated back to after a checkpoint
+
+# Schema for the per-cycle status rows read by the dashboard. Like the other
+# per-cycle tables it is stored as one table per UTC day ({table} is e.g.
+# internet_status_p20240131) behind a UNION ALL view named after the table.
+CREATE_STATUS_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    timestamp DATETIME,
+    ts_ms INTEGER,
+    status TEXT,
+    success_percentage INTEGER,
+    avg_latency_ms REAL,
+    max_latency_ms REAL,
+    min_latency_ms REAL,
+    packet_loss REAL,
+    p50_latency_ms REAL,
+    p95_latency_ms REAL,
+    p99_latency_ms REAL,
+    stddev_latency_ms REAL,
+    jitter_ms REAL,
+    latency_sketch BLOB
+)
+"""
+
+# Columns copied from internet_status into its partitions
+STATUS_COLUMNS = """
+    id, timestamp, ts_ms, status, success_percentage, avg_latency_ms, max_latency_ms, min_latency_ms,
+    packet_loss, p50_latency_ms, p95_latency_ms, p99_latency_ms, stddev_latency_ms, jitter_ms, latency_sketch
+"""
+
+# Columns added to internet_status after its first release, for upgrading existing databases
+STATUS_COLUMNS_ADDED = [
+    ('ts_ms', 'INTEGER'),
+    ('p50_latency_ms', 'REAL'),
+    ('p95_latency_ms', 'REAL'),
+    ('p99_latency_ms', 'REAL'),
+    ('stddev_latency_ms', 'REAL'),
+    ('jitter_ms', 'REAL'),
+    ('latency_sketch', 'BLOB'),
+]
+
+# Range scans (dashboard filters, retention) go through the epoch-ms index
+CREATE_STATUS_TS_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_{table}_ts_ms ON {table} (ts_ms)
+"""
+
+# Probe targets, referenced by id from the per-target tables
+CREATE_TARGETS_TABLE = """
+CREATE TABLE IF NOT EXISTS targets (
+    id INTEGER PRIMARY KEY,
+    address TEXT UNIQUE NOT NULL
+)
+"""
+
+# Every individual probe: send time in epoch ms and RTT in integer microseconds (NULL when lost)
+CREATE_SAMPLES_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    target_id INTEGER NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    rtt_us INTEGER
+)
+"""
+CREATE_SAMPLES_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_{table}_target_ts ON {table} (target_id, ts_ms)
+"""
+
+# Per-target aggregates for each internet_status row (stored in the partition of that row)
+CREATE_TARGET_STATUS_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    status_id INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    success_percentage INTEGER,
+    avg_latency_ms REAL,
+    max_latency_ms REAL,
+    min_latency_ms REAL,
+    packet_loss REAL,
+    PRIMARY KEY (status_id, target_id)
+)
+"""
+
+# Tables stored as daily partitions, with the statements that create one partition
+PARTITIONED_TABLES = [
+    ('internet_status', [CREATE_STATUS_TABLE, CREATE_STATUS_TS_INDEX]),
+    ('target_status', [CREATE_TARGET_STATUS_TABLE]),
+    ('probe_samples', [CREATE_SAMPLES_TABLE, CREATE_SAMPLES_INDEX]),
+]
+
+# internet_status ids are unique across partitions, so they are handed out from here
+CREATE_ID_SEQUENCE_TABLE = """
+CREATE TABLE IF NOT EXISTS id_sequence (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+)
+"""
+
+# One row per scheduler tick: whether its cycle ran on time, late, or was skipped
+CREATE_TICKS_TABLE = """
+CREATE TABLE IF NOT EXISTS checker_ticks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scheduled_at DATETIME,
+    outcome TEXT,
+    lag_ms INTEGER,
+    duration_ms INTEGER
+)
+"""
+
+
+# Rollup tiers of internet_status, finest first: (table, bucket size in ms)
+ROLLUP_TIERS = [
+    ('internet_status_5m', 5 * 60 * 1000),
+    ('internet_status_1h', 60 * 60 * 1000),
+    ('internet_status_1d', 24 * 60 * 60 * 1000),
+]
+
+# Rollup buckets keep sums and counts so they can be merged further; averages are sum / count
+CREATE_ROLLUP_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    bucket_ms INTEGER PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    success_sum REAL,
+    packet_loss_sum REAL,
+    full_up_count INTEGER,
+    partial_up_count INTEGER,
+    down_count INTEGER,
+    latency_count INTEGER,
+    avg_latency_sum REAL,
+    min_latency_ms REAL,
+    max_latency_ms REAL,
+    stddev_latency_sum REAL,
+    jitter_sum REAL,
+    latency_sketch BLOB
+)
+"""
+
+# Adds one internet_status row to its bucket. MIN()/MAX() with several
+# arguments return NULL if any is NULL, hence the COALESCE.
+UPSERT_ROLLUP = """
+INSERT INTO {table} (bucket_ms, samples, success_sum, packet_loss_sum, full_up_count, partial_up_count,
+                     down_count, latency_count, avg_latency_sum, min_latency_ms, max_latency_ms,
+                     stddev_latency_sum, jitter_sum, latency_sketch)
+VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (bucket_ms) DO UPDATE SET
+    samples = samples + 1,
+    success_sum = success_sum + excluded.success_sum,
+    packet_loss_sum = packet_loss_sum + excluded.packet_loss_sum,
+    full_up_count = full_up_count + excluded.full_up_count,
+    partial_up_count = partial_up_count + excluded.partial_up_count,
+    down_count = down_count + excluded.down_count,
+    latency_count = latency_count + excluded.latency_count,
+    avg_latency_sum = COALESCE(avg_latency_sum + excluded.avg_latency_sum, avg_latency_sum, excluded.avg_latency_sum),
+    min_latency_ms = COALESCE(MIN(min_latency_ms, excluded.min_latency_ms), min_latency_ms, excluded.min_latency_ms),
+    max_latency_ms = COALESCE(MAX(max_latency_ms, excluded.max_latency_ms), max_latency_ms, excluded.max_latency_ms),
+    stddev_latency_sum = COALESCE(stddev_latency_sum + excluded.stddev_latency_sum, stddev_latency_sum,
+                                  excluded.stddev_latency_sum),
+    jitter_sum = COALESCE(jitter_sum + excluded.jitter_sum, jitter_sum, excluded.jitter_sum),
+    latency_sketch = COALESCE(excluded.latency_sketch, latency_sketch)
+"""
+
+# Rebuilds a rollup tier from internet_status (sketches are merged separately)
+REBUILD_ROLLUP = """
+INSERT INTO {table} (bucket_ms, samples, success_sum, packet_loss_sum, full_up_count, partial_up_count,
+                     down_count, latency_count, avg_latency_sum, min_latency_ms, max_latency_ms,
+                     stddev_latency_sum, jitter_sum)
+SELECT ts_ms / {size} * {size},
+       COUNT(*),
+       SUM(success_percentage),
+       SUM(packet_loss),
+       SUM(success_percentage = 100),
+       SUM(success_percentage > 0 AND success_percentage < 100),
+       SUM(success_percentage = 0),
+       COUNT(avg_latency_ms),
+       SUM(avg_latency_ms),
+       MIN(min_latency_ms),
+       MAX(max_latency_ms),
+       SUM(stddev_latency_ms),
+       SUM(jitter_ms)
+FROM internet_status
+WHERE ts_ms IS NOT NULL
+GROUP BY 1
+"""
+
+
+# Function to open the status database and make sure the schema exists
+def open_db(db_path):
+    """
+    Opens a connection to the status database, creating the schema once.
+    """
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    # Lets dropped partitions hand their pages back; only takes effect on a new file or after VACUUM
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    init_schema(conn)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("VACUUM")  # One-off rewrite of databases created before partitioning
+    # In WAL mode dashboard reads never block the checker's inserts (or the
+    # other way round). NORMAL sync is still safe against crashes of either process.
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA journal_size_limit = {WAL_SIZE_LIMIT}")
+    return conn
+
+
+# Function to open the status database for reading only (the dashboard)
+def open_db_readonly(db_path):
+    """
+    Opens a read-only connection. It never creates or migrates the schema,
+    so it can't take write locks away from the checker.
+    """
+    return sqlite3.connect(f"{Path(db_path).absolute().as_uri()}?mode=ro", uri=True, timeout=BUSY_TIMEOUT)
+
+
+def init_schema(conn):
+    with conn:
+        # sqlite3 only opens a transaction by itself before DML, so without this the
+        # DDL below (e.g. partition_tables' renames) would commit statement by statement
+        conn.execute("BEGIN IMMEDIATE")
+        if _object_type(conn, 'internet_status') == 'table':
+            # Unpartitioned database from an older version, split up by migrate()
+            _add_missing_columns(conn, 'internet_status', STATUS_COLUMNS_ADDED)
+        conn.execute(CREATE_TICKS_TABLE)
+        conn.execute(CREATE_TARGETS_TABLE)
+        conn.execute(CREATE_ID_SEQUENCE_TABLE)
+        for table, _ in ROLLUP_TIERS:
+            conn.execute(CREATE_ROLLUP_TABLE.format(table=table))
+        migrate(conn)
+        ensure_partitions(conn, int(time.time() * 1000))
+
+
+# Function to bring an existing database up to SCHEMA_VERSION
+def migrate(conn):
+    """
+    Runs the data migrations newer than the database's PRAGMA user_version.
+    Must be called inside a transaction, after missing columns were added.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    unpartitioned = _object_type(conn, 'internet_status') == 'table'
+    if version < 1 and unpartitioned:
+        # Backfill the epoch-ms column from the text timestamps, which hold local time
+        conn.execute(
+            """
+            UPDATE internet_status
+            SET ts_ms = CAST(strftime('%s', timestamp, 'utc') AS INTEGER) * 1000
+            WHERE ts_ms IS NULL
+            """
+        )
+    if version < 2 and unpartitioned:
+        rebuild_rollups(conn)
+    if version < 3 and unpartitioned:
+        partition_tables(conn)
+    if version < SCHEMA_VERSION:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _object_type(conn, name):
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row and row[0]
+
+
+# Function to name the daily partition of a table holding `ts_ms`
+def partition_name(base, ts_ms):
+    day = datetime.fromtimestamp(ts_ms // DAY_MS * DAY_MS / 1000, timezone.utc)
+    return f"{base}_p{day:%Y%m%d}"
+
+
+# Function to list the daily partitions of a table
+def list_partitions(conn, base):
+    """
+    Returns [(day start in epoch ms, partition table)], oldest first.
+    """
+    partitions = []
+    for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name",
+            (f"{base}_p[0-9]*",)):
+        day = datetime.strptime(name[-8:], '%Y%m%d').replace(tzinfo=timezone.utc)
+        partitions.append((int(day.timestamp()) * 1000, name))
+    return partitions
+
+
+# Function to create the partitions of the day holding `ts_ms` if they are missing
+def ensure_partitions(conn, ts_ms):
+    """
+    Must be called inside an explicit transaction (BEGIN), or the views are
+    briefly dropped in autocommit and readers see "no such table".
+    """
+    if _object_type(conn, partition_name('internet_status', ts_ms)) == 'table':
+        return
+    for base, statements in PARTITIONED_TABLES:
+        for statement in statements:
+            conn.execute(statement.format(table=partition_name(base, ts_ms)))
+    refresh_views(conn)
+
+
+# Function to point each partitioned table's view at its current partitions
+def refresh_views(conn):
+    for base, _ in PARTITIONED_TABLES:
+        partitions = list_partitions(conn, base)
+        conn.execute(f"DROP VIEW IF EXISTS {base}")
+        if partitions:
+            conn.execute(f"CREATE VIEW {base} AS " + " UNION ALL ".join(f"SELECT * FROM {name}" for _, name in partitions))
+
+
+# Function to build the FROM source for the rows of a table in a time range
+def partition_source(conn, base, start_ms, end_ms):
+    """
+    Returns a table name or UNION ALL subquery covering only the partitions
+    that overlap [start_ms, end_ms], so range queries never touch the other
+    days. Unpartitioned databases just get `base` back.
+    """
+    partitions = [name for day_ms, name in list_partitions(conn, base)
+                  if day_ms <= end_ms and day_ms + DAY_MS > start_ms]
+    if not partitions:
+        return base
+    if len(partitions) == 1:
+        return partitions[0]
+    return "(" + " UNION ALL ".join(f"SELECT * FROM {name}" for name in partitions) + ")"
+
+
+# Function to split the unpartitioned per-cycle tables into daily partitions
+def partition_tables(conn):
+    """
+    Moves internet_status, target_status and probe_samples rows into their
+    daily partitions, drops the old tables and seeds the id sequence. Must
+    be called inside a transaction.
+    """
+    # Databases older than the per-target tables only have internet_status
+    moved = [base for base, _ in PARTITIONED_TABLES if _object_type(conn, base) == 'table']
+    for base in moved:
+        conn.execute(f"ALTER TABLE {base} RENAME TO {base}_unpartitioned")
+
+    days = set()
+    for base in ('internet_status', 'probe_samples'):
+        if base in moved:
+            days.update(day for (day,) in conn.execute(
+                f"SELECT DISTINCT ts_ms / ? * ? FROM {base}_unpartitioned WHERE ts_ms IS NOT NULL", (DAY_MS, DAY_MS)))
+    for day in sorted(days):
+        ensure_partitions(conn, day)
+        day_range = (day, day + DAY_MS - 1)
+        conn.execute(
+            f"""
+            INSERT INTO {partition_name('internet_status', day)} ({STATUS_COLUMNS})
+            SELECT {STATUS_COLUMNS} FROM internet_status_unpartitioned WHERE ts_ms BETWEEN ? AND ?
+            """,
+            day_range
+        )
+        if 'target_status' in moved:
+            conn.execute(
+                f"""
+                INSERT INTO {partition_name('target_status', day)}
+                SELECT t.status_id, t.target_id, t.success_percentage, t.avg_latency_ms,
+                       t.max_latency_ms, t.min_latency_ms, t.packet_loss
+                FROM target_status_unpartitioned t
+                JOIN internet_status_unpartitioned s ON s.id = t.status_id
+                WHERE s.ts_ms BETWEEN ? AND ?
+                """,
+                day_range
+            )
+        if 'probe_samples' in moved:
+            conn.execute(
+                f"""
+                INSERT INTO {partition_name('probe_samples', day)}
+                SELECT target_id, ts_ms, rtt_us FROM probe_samples_unpartitioned WHERE ts_ms BETWEEN ? AND ?
+                """,
+                day_range
+            )
+    conn.execute(
+        "INSERT OR REPLACE INTO id_sequence (name, value) "
+        "SELECT 'internet_status', COALESCE(MAX(id), 0) FROM internet_status_unpartitioned"
+    )
+    for base in moved:
+        conn.execute(f"DROP TABLE {base}_unpartitioned")
+
+
+# Function to read a token that changes whenever the per-cycle data changes
+def data_version(conn):
+    """
+    Returns the last internet_status id handed out. Every insert_cycle bumps
+    it, and retention only drops data right after an insert, so readers
+    can use it as a cheap cache key across processes.
+    """
+    row = conn.execute("SELECT value FROM id_sequence WHERE name = 'internet_status'").fetchone()
+    return row[0] if row else 0
+
+
+# Function to read the median latency of the newest cycle that got replies
+def latest_median_rtt(conn):
+    """
+    Returns p50_latency_ms of the newest such row in the newest partition,
+    or None, for the probe engine's fail-fast deadline.
+    """
+    partitions = list_partitions(conn, 'internet_status')
+    if not partitions:
+        return None
+    row = conn.execute(
+        f"SELECT p50_latency_ms FROM {partitions[-1][1]} "
+        "WHERE p50_latency_ms IS NOT NULL ORDER BY ts_ms DESC LIMIT 1"
+    ).fetchone()
+    return row[0] if row else None
+
+
+# Function to hand out the next internet_status id
+def next_status_id(conn):
+    conn.execute(
+        "INSERT INTO id_sequence (name, value) VALUES ('internet_status', 1) "
+        "ON CONFLICT (name) DO UPDATE SET value = value + 1"
+    )
+    return conn.execute("SELECT value FROM id_sequence WHERE name = 'internet_status'").fetchone()[0]
+
+
+def _add_missing_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, column_type in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+# Function to recompute every rollup tier from internet_status
+def rebuild_rollups(conn):
+    """
+    Recomputes the rollup tables from scratch (used when they are first
+    created on an existing database). Must be called inside a transaction.
+    """
+    for table, size in ROLLUP_TIERS:
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(REBUILD_ROLLUP.format(table=table, size=size))
+
+        buckets = defaultdict(list)
+        for ts_ms, blob in conn.execute(
+                "SELECT ts_ms, latency_sketch FROM internet_status WHERE latency_sketch IS NOT NULL"):
+            buckets[ts_ms // size * size].append(blob)
+        conn.executemany(
+            f"UPDATE {table} SET latency_sketch = ? WHERE bucket_ms = ?",
+            [(merge_sketches(blobs).to_bytes(), bucket) for bucket, blobs in buckets.items()]
+        )
+
+
+# Function to add one internet_status row to every rollup tier
+def update_rollups(conn, ts_ms, row):
+    """
+    Incrementally folds a freshly inserted row into its 5-minute, hourly and
+    daily buckets. Must be called inside the transaction that inserted it.
+    """
+    success = row['success_percentage']
+    has_latency = row['avg_latency_ms'] is not None
+    for table, size in ROLLUP_TIERS:
+        bucket = ts_ms // size * size
+        sketch_blob = row['latency_sketch']
+        if sketch_blob is not None:
+            existing = conn.execute(f"SELECT latency_sketch FROM {table} WHERE bucket_ms = ?", (bucket,)).fetchone()
+            if existing is not None and existing[0] is not None:
+                sketch_blob = merge_sketches([existing[0], sketch_blob]).to_bytes()
+        conn.execute(
+            UPSERT_ROLLUP.format(table=table),
+            (bucket, success, row['packet_loss'], int(success == 100), int(0 < success < 100), int(success == 0),
+             int(has_latency), row['avg_latency_ms'], row['min_latency_ms'], row['max_latency_ms'],
+             row['stddev_latency_ms'], row['jitter_ms'], sketch_blob)
+        )
+
+
+# Function to format epoch seconds the way the timestamp columns store them (local time)
+def format_timestamp(epoch):
+    return datetime.fromtimestamp(epoch).strftime('%Y-%m-%d %H:%M:%S')
+
+
+# Function to map target addresses to their ids, registering new targets
+def target_ids(conn, targets):
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO targets (address) VALUES (?)", [(t,) for t in targets])
+    return dict(conn.execute("SELECT address, id FROM targets"))
+
+
+# Function to insert one cycle's rows in a single transaction
+def insert_cycle(conn, scheduled_at, row, target_rows, samples, ids):
+    """
+    Inserts a summarized cycle (see probe_engine.summarize) stamped with its
+    scheduled tick (epoch seconds) into internet_status, its per-target
+    summaries into target_status, the raw samples into probe_samples and
+    folds it into the rollup tiers, all in one transaction. `ids` maps target
+    addresses to target ids (see target_ids).
+
+    Rows go to the daily partitions of their own ts_ms (target_status rows
+    to the partition of their cycle), which are created on the first insert
+    of each day.
+    """
+    ts_ms = int(scheduled_at * 1000)
+    with conn:
+        # A new day's partitions and views are created here too, and must not become visible
+        # (or go missing after a crash) apart from the rows (see init_schema)
+        conn.execute("BEGIN IMMEDIATE")
+        ensure_partitions(conn, ts_ms)
+        status_id = next_status_id(conn)
+        conn.execute(
+            f"""
+            INSERT INTO {partition_name('internet_status', ts_ms)} ({STATUS_COLUMNS})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (status_id, format_timestamp(scheduled_at), ts_ms, row['status'], row['success_percentage'],
+             row['avg_latency_ms'], row['max_latency_ms'], row['min_latency_ms'], row['packet_loss'], row['p50_latency_ms'],
+             row['p95_latency_ms'], row['p99_latency_ms'], row['stddev_latency_ms'], row['jitter_ms'],
+             row['latency_sketch'])
+        )
+        conn.executemany(
+            f"""
+            INSERT INTO {partition_name('target_status', ts_ms)} (status_id, target_id, success_percentage, avg_latency_ms,
+                                       max_latency_ms, min_latency_ms, packet_loss)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(status_id, ids[target], r['success_percentage'], r['avg_latency_ms'],
+              r['max_latency_ms'], r['min_latency_ms'], r['packet_loss'])
+             for target, r in target_rows.items()]
+        )
+        samples_by_day = defaultdict(list)
+        for s in samples:
+            sent_ms = int(s.sent_at * 1000)
+            samples_by_day[sent_ms // DAY_MS * DAY_MS].append(
+                (ids[s.target], sent_ms, None if s.rtt_ms is None else round(s.rtt_ms * 1000)))
+        for day, day_samples in samples_by_day.items():
+            ensure_partitions(conn, day)
+            conn.executemany(
+                f"INSERT INTO {partition_name('probe_samples', day)} (target_id, ts_ms, rtt_us) VALUES (?, ?, ?)",
+                day_samples
+            )
+        update_rollups(conn, ts_ms, row)
+        return status_id
+
+
+# Function to record the outcome of a scheduler tick
+def insert_tick(conn, scheduled_at, outcome, lag_ms, duration_ms=None):
+    """
+    Records a tick as 'ran', 'late' or 'skipped' along with how late the cycle
+    started and how long it took.
+    """
+    with conn:
+        conn.execute(
+            "INSERT INTO checker_ticks (scheduled_at, outcome, lag_ms, duration_ms) VALUES (?, ?, ?, ?)",
+            (scheduled_at, outcome, lag_ms, duration_ms)
+        )
+
+
+# Function to remove rows older than the retention period
+def cleanup_old_rows(conn, retention_days):
+    """
+    Drops the daily partitions that lie entirely before the retention cutoff
+    and trims the rollup and tick tables alongside (rollups to the start of
+    the oldest partition kept). Nothing expires between
+    day boundaries, so this is a no-op except once a day. Returns the number
+    of days dropped.
+    """
+    cutoff_ms = int((time.time() - retention_days * 86400) * 1000)
+    expired = [day for day, _ in list_partitions(conn, 'internet_status') if day + DAY_MS <= cutoff_ms]
+    if not expired:
+        return 0
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")  # Drop partitions and refresh the views atomically (see init_schema)
+        for day in expired:
+            for base, _ in PARTITIONED_TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {partition_name(base, day)}")
+        refresh_views(conn)
+        conn.execute("DELETE FROM checker_ticks WHERE scheduled_at < datetime('now', 'localtime', ?)",
+                     (f'-{retention_days} days',))
+        # Rollups cover the same span as the raw rows that remain, so graphs read
+        # from a tier start where get_range_bounds and the log table do
+        kept = list_partitions(conn, 'internet_status')
+        keep_from_ms = kept[0][0] if kept else cutoff_ms
+        for table, _ in ROLLUP_TIERS:
+            conn.execute(f"DELETE FROM {table} WHERE bucket_ms < ?", (keep_from_ms,))
+    # Give the dropped partitions' pages back to the filesystem (executescript
+    # steps the pragma to completion, execute() would free a single page)
+    conn.executescript("PRAGMA incremental_vacuum")
+    checkpoint(conn)
+    return len(expired)
+
+
+# Function to copy the WAL back into the database file and reset it
+def checkpoint(conn):
+    """
+    Runs a TRUNCATE checkpoint, which waits (up to BUSY_TIMEOUT) for readers
+    still on old WAL frames. SQLite's automatic checkpoints are PASSIVE and
+    can't restart the WAL while a dashboard read holds an old snapshot, so
+    this once-a-day checkpoint keeps the file from creeping up. Returns True
+    if the whole WAL was checkpointed.
+    """
+    busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    return not busy